@@ -0,0 +1,185 @@
+"""Optional RAM compositing for DisplayManager.
+
+Compositor stands in for the st7789 driver: fill, hline, fill_rect, write and
+blit_buffer draw into a full-screen RGB565 framebuf instead of the panel, and
+each drawn region is recorded as a dirty rectangle. Rectangles that overlap,
+touch or nearly touch are merged as they are recorded, and flush() sends each
+remaining one with a single blit_buffer(), so a frame costs a handful of bus
+transactions however many fields changed.
+"""
+
+import framebuf
+from array import array
+from raster import swap16, draw_text
+
+# Dirty rectangles kept per frame; beyond this the cheapest merge is forced
+_MAX_RECTS = 16
+
+# A merge may cover this many extra pixels and still beat a separate
+# blit_buffer() with its own address window setup
+_MERGE_SLACK_PX = 512
+
+# Full-width rows staged per blit_buffer() for rectangles narrower than the screen
+_STAGE_ROWS = 18
+
+
+class Compositor:
+    __slots__ = ('_tft', 'width', 'height', '_buf', '_mv', '_fb', '_stage', '_r', '_n',
+                 'rects', 'blits', 'pixels', 'bytes', 'frames')
+
+    def __init__(self, tft, width, height):
+        self._tft = tft
+        self.width = width
+        self.height = height
+        # Screen copy in panel byte order, like every buffer sent with blit_buffer()
+        self._buf = bytearray(width * height * 2)
+        self._mv = memoryview(self._buf)
+        self._fb = framebuf.FrameBuffer(self._buf, width, height, framebuf.RGB565)
+        self._stage = memoryview(bytearray(width * _STAGE_ROWS * 2))
+        # Dirty rectangles as x0, y0, x1, y1 (exclusive ends)
+        self._r = array('h', [0] * (4 * _MAX_RECTS))
+        self._n = 0
+        # Last flush(): merged rectangles, blit_buffer() calls, pixels and bytes sent
+        # (all zero when nothing was dirty); frames counts the flushes that sent anything
+        self.rects = 0
+        self.blits = 0
+        self.pixels = 0
+        self.bytes = 0
+        self.frames = 0
+
+    # --- st7789 drawing calls used by DisplayManager ---
+
+    def fill(self, c):
+        self._fb.fill(swap16(c))
+        self._mark(0, 0, self.width, self.height)
+
+    def hline(self, x, y, w, c):
+        self._fb.hline(x, y, w, swap16(c))
+        self._mark(x, y, w, 1)
+
+    def fill_rect(self, x, y, w, h, c):
+        self._fb.fill_rect(x, y, w, h, swap16(c))
+        self._mark(x, y, w, h)
+
+    def write(self, font, text, x, y, fg, bg=0):
+        end = draw_text(self._fb, font, text, x, y, fg, bg)
+        self._mark(x, y, end - x, font.HEIGHT)
+
+    def blit_buffer(self, buf, x, y, w, h):
+        self._fb.blit(framebuf.FrameBuffer(buf, w, h, framebuf.RGB565), x, y)
+        self._mark(x, y, w, h)
+
+    # --- Dirty rectangles ---
+
+    def _remove(self, i):
+        """Drop rectangle i by moving the last one into its place."""
+        r = self._r
+        self._n -= 1
+        k = 4 * i
+        j = 4 * self._n
+        r[k] = r[j]
+        r[k + 1] = r[j + 1]
+        r[k + 2] = r[j + 2]
+        r[k + 3] = r[j + 3]
+
+    def _mark(self, x, y, w, h):
+        """Record a drawn region, merged with the rectangles it is cheaper to send together with."""
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + w, self.width)
+        y1 = min(y + h, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        r = self._r
+        while True:
+            # Absorb every rectangle whose union with this one is worth it; the
+            # grown rectangle may now reach others, so rescan after each merge
+            i = 0
+            best = -1
+            best_cost = 0
+            area = (x1 - x0) * (y1 - y0)
+            while i < self._n:
+                k = 4 * i
+                u0 = min(x0, r[k])
+                v0 = min(y0, r[k + 1])
+                u1 = max(x1, r[k + 2])
+                v1 = max(y1, r[k + 3])
+                other = (r[k + 2] - r[k]) * (r[k + 3] - r[k + 1])
+                cost = (u1 - u0) * (v1 - v0) - area - other
+                if cost <= _MERGE_SLACK_PX:
+                    x0, y0, x1, y1 = u0, v0, u1, v1
+                    area = (x1 - x0) * (y1 - y0)
+                    self._remove(i)
+                    i = 0
+                    best = -1
+                    continue
+                if best < 0 or cost < best_cost:
+                    best = i
+                    best_cost = cost
+                i += 1
+            if self._n < _MAX_RECTS:
+                break
+            # Table full: merge with the rectangle that adds the fewest pixels
+            k = 4 * best
+            x0 = min(x0, r[k])
+            y0 = min(y0, r[k + 1])
+            x1 = max(x1, r[k + 2])
+            y1 = max(y1, r[k + 3])
+            self._remove(best)
+        k = 4 * self._n
+        r[k] = x0
+        r[k + 1] = y0
+        r[k + 2] = x1
+        r[k + 3] = y1
+        self._n += 1
+
+    def flush(self):
+        """Send every dirty rectangle to the panel and start a new frame.
+        Returns the number of blit_buffer() calls"""
+        tft = self._tft
+        mv = self._mv
+        stage = self._stage
+        r = self._r
+        stride = self.width * 2
+        # A frame with nothing dirty reports zeros, not the previous frame's figures
+        self.rects = 0
+        self.blits = 0
+        self.pixels = 0
+        self.bytes = 0
+        blits = 0
+        pixels = 0
+        for i in range(self._n):
+            k = 4 * i
+            x0 = r[k]
+            y0 = r[k + 1]
+            x1 = r[k + 2]
+            y1 = r[k + 3]
+            w = x1 - x0
+            pixels += w * (y1 - y0)
+            if w == self.width:
+                # Full-width rows are contiguous in the screen copy
+                tft.blit_buffer(mv[y0 * stride:y1 * stride], 0, y0, w, y1 - y0)
+                blits += 1
+                continue
+            row = w * 2
+            rows = len(stage) // row
+            y = y0
+            while y < y1:
+                n = min(rows, y1 - y)
+                o = 0
+                s = y * stride + x0 * 2
+                for _ in range(n):
+                    stage[o:o + row] = mv[s:s + row]
+                    o += row
+                    s += stride
+                tft.blit_buffer(stage[:o], x0, y, w, n)
+                blits += 1
+                y += n
+        if blits:
+            self.rects = self._n
+            self.blits = blits
+            self.pixels = pixels
+            self.bytes = pixels * 2
+            self.frames += 1
+        self._n = 0
+        return blits
@@ -19,18 +19,24 @@ class DHTReader:
         self._humidity = None
 
     def update(self):
-        """Read sensor if enough time has elapsed. Keeps last good reading on error."""
+        """Read sensor if enough time has elapsed. Keeps last good reading on error.
+        Returns True if a new reading changed the values."""
         now = time.ticks_ms()
         if time.ticks_diff(now, self._last_read) < _READ_INTERVAL_MS:
-            return
+            return False
         self._last_read = now
         try:
             self._sensor.measure()
-            self._temp_c = self._sensor.temperature()
-            self._temp_f = self._temp_c * 9.0 / 5.0 + 32.0
-            self._humidity = self._sensor.humidity()
+            t = self._sensor.temperature()
+            h = self._sensor.humidity()
         except Exception:
-            pass
+            return False
+        if t == self._temp_c and h == self._humidity:
+            return False
+        self._temp_c = t
+        self._temp_f = t * 9.0 / 5.0 + 32.0
+        self._humidity = h
+        return True
 
     @property
     def has_reading(self):
@@ -0,0 +1,73 @@
+"""Allocation-free formatting into preallocated bytearrays.
+
+Two-digit fields are copied from a 00-99 lookup table, so formatting a time,
+date or count in the display hot path creates no str objects; the buffers
+are drawn as they are.
+"""
+
+SPACE = 0x20
+DASH = 0x2D
+SLASH = 0x2F
+COLON = 0x3A
+
+# "000102...99": the two ASCII digits of n at 2n, 2n + 1
+_PAIRS = bytearray(200)
+for _n in range(100):
+    _PAIRS[2 * _n] = 0x30 + _n // 10
+    _PAIRS[2 * _n + 1] = 0x30 + _n % 10
+
+
+def put2(buf, i, v):
+    """Write 0 <= v <= 99 as two digits at buf[i]."""
+    v += v
+    buf[i] = _PAIRS[v]
+    buf[i + 1] = _PAIRS[v + 1]
+
+
+def put_uint(buf, i, v):
+    """Write v >= 0 without leading zeros at buf[i]; returns the index after it."""
+    n = 1
+    t = v
+    while t >= 10:
+        t //= 10
+        n += 1
+    end = i + n
+    k = end
+    while k > i:
+        k -= 1
+        buf[k] = 0x30 + v % 10
+        v //= 10
+    return end
+
+
+def put_bytes(buf, i, b):
+    """Copy the bytes of b to buf[i]; returns the index after them."""
+    for c in b:
+        buf[i] = c
+        i += 1
+    return i
+
+
+def pad(buf, i, c=SPACE):
+    """Fill buf from i to its end with c."""
+    for k in range(i, len(buf)):
+        buf[k] = c
+
+
+def hms(buf, h, m, s):
+    """HH:MM:SS into buf[0:8]."""
+    put2(buf, 0, h)
+    buf[2] = COLON
+    put2(buf, 3, m)
+    buf[5] = COLON
+    put2(buf, 6, s)
+
+
+def ymd(buf, y, m, d):
+    """YYYY-MM-DD into buf[0:10]."""
+    put2(buf, 0, y // 100)
+    put2(buf, 2, y % 100)
+    buf[4] = DASH
+    put2(buf, 5, m)
+    buf[7] = DASH
+    put2(buf, 8, d)
@@ -6,9 +6,17 @@ Zone A (top): Local time + TZ + date, UTC time + date below
 Zone B (bottom): Satellite info, fix status, coordinates, grid square
 """
 
+import time
 import st7789
+from array import array
 import fixed_v01_16 as font_big
 import fixed_v01_8 as font_small
+from raster import TextBuffer, GlyphCache, char_width, text_width, code_map
+from digit_fmt import SLASH, put_bytes, put_uint, pad, hms
+from time_core import local_sod
+from compositor import Compositor
+from gps_reader import (DIRTY_TIME, DIRTY_DATE, DIRTY_SATS, DIRTY_FIX,
+                        DIRTY_POS, DIRTY_COORDS)
 
 # Colors (RGB565)
 WHITE = st7789.color565(255, 255, 255)
@@ -49,187 +57,500 @@ STATUS_X = 8
 STATUS_Y = 142
 STATUS_CLEAR_W = 180
 
-# Cache key indices (list-based cache instead of dict)
-_K_LOCAL_DATE = 0
-_K_TIME = 1
-_K_TZ = 2
-_K_UTC_DATE = 3
-_K_UTC_TIME = 4
-_K_UTC_LABEL = 5
-_K_SATS = 6
-_K_FIX = 7
-_K_LAT = 8
-_K_LON = 9
-_K_GRID = 10
-_K_UTM = 11
-_K_STATUS = 12
-_K_TEMP = 13
-_K_HUM = 14
-_NUM_KEYS = 15
-
+# Background of every field
 _EMPTY = ("", BLACK)
 
+# Time field width (big font) and the colours of valid local and UTC time
+_TIME_CLEAR_W = 102
+_TIME_COLOR = WHITE
+_UTC_TIME_COLOR = GRAY
+
+# Widest big-font field (the date): glyph cache runs up to this go out in one blit
+_GLYPH_STAGE_W = 126
+
+# Field dirty bit for the DHT22 reading (outside GPSReader's DIRTY_* bits)
+DIRTY_DHT = 0x40
+
+# Field.pre: time fields rendered ahead for the next second (local or UTC)
+PRE_NONE = -1
+PRE_LOCAL = 0
+PRE_UTC = 1
+
+# One-byte strings and "00"-"99" for drawing byte-row cells without allocating
+_CHARS = tuple(bytes((c,)) for c in range(128))
+_DIGIT_PAIRS = tuple(bytes((48 + n // 10, 48 + n % 10)) for n in range(100))
+
+_NO_TIME = b"--:--:--"
+# Fix type (1 = none, 2 = 2D, 3 = 3D) as shown after "Fix:"
+_FIX_NAMES = (b"None", b"None", b"2D", b"3D")
+
+
+def _pad(font, text, width):
+    """text followed by as many spaces as fit within width pixels."""
+    n = (width - text_width(font, text)) // char_width(font, " ")
+    return text + " " * n if n > 0 else text
+
+
+# --- Byte-row sources (Field.size > 0): (gps, tz, dht, buf) -> color, or -1 to leave
+# the field blank. They fill all of buf and allocate nothing ---
+
+def _local_date(gps, tz, dht, buf):
+    gps.date_into(buf, tz.offset)
+    return YELLOW if gps.time_is_valid else GRAY
+
+
+def _local_time(gps, tz, dht, buf):
+    if gps.time_is_valid:
+        gps.time_into(buf, tz.offset)
+        return _TIME_COLOR
+    put_bytes(buf, 0, _NO_TIME)
+    return GRAY
+
+
+def _utc_date(gps, tz, dht, buf):
+    gps.date_into(buf, 0)
+    return GRAY
+
+
+def _utc_time(gps, tz, dht, buf):
+    if gps.time_is_valid:
+        gps.time_into(buf, 0)
+        return _UTC_TIME_COLOR
+    put_bytes(buf, 0, _NO_TIME)
+    return GRAY
+
+
+# Zone B stays blank until the first fix
+def _sats(gps, tz, dht, buf):
+    if not gps.has_ever_had_fix:
+        return -1
+    i = put_uint(buf, put_bytes(buf, 0, b"Sat:"), gps.satellites_in_use)
+    buf[i] = SLASH
+    pad(buf, put_uint(buf, i + 1, gps.satellites_in_view))
+    return WHITE
+
+
+def _fix(gps, tz, dht, buf):
+    if not gps.has_ever_had_fix:
+        return -1
+    ft = gps.fix_type
+    pad(buf, put_bytes(buf, put_bytes(buf, 0, b"Fix:"), _FIX_NAMES[ft if 0 <= ft <= 3 else 0]))
+    return GREEN if gps.has_fix else RED
+
+
+# --- Field sources: (gps, tz, dht) -> (text, color), or None to leave the field blank ---
+
+def _tz_label(gps, tz, dht):
+    return tz.abbreviation, CYAN
+
+
+def _utc_label(gps, tz, dht):
+    return "UTC", CYAN
+
+
+def _lat(gps, tz, dht):
+    if gps.has_ever_had_fix:
+        if gps.has_fix:
+            return gps.lat_str(), WHITE
+        return "-- N", GRAY
+
+
+def _lon(gps, tz, dht):
+    if gps.has_ever_had_fix:
+        if gps.has_fix:
+            return gps.lon_str(), WHITE
+        return "-- W", GRAY
+
+
+def _grid(gps, tz, dht):
+    if gps.has_ever_had_fix:
+        return gps.maidenhead if gps.has_fix else "------", CYAN
+
+
+def _utm(gps, tz, dht):
+    if gps.has_ever_had_fix:
+        if gps.has_fix:
+            return gps.utm, WHITE
+        return "-- --E --N", GRAY
+
+
+def _status(gps, tz, dht):
+    # The empty status also clears the acquiring message after the first fix
+    if not gps.has_ever_had_fix:
+        return "Acquiring satellites...", ORANGE
+    if gps.has_fix:
+        return _EMPTY
+    return "Signal lost", RED
+
+
+def _temp(gps, tz, dht):
+    if dht is not None:
+        if dht.has_reading:
+            return "{:.1f}F".format(dht.temperature_f), WHITE
+        return "--.-F", GRAY
+
+
+def _hum(gps, tz, dht):
+    if dht is not None:
+        if dht.has_reading:
+            return "{:.1f}%".format(dht.humidity), WHITE
+        return "--.-%", GRAY
+
+
+class Field:
+    """One layout row. source(gps, tz, dht) gives the text and colour; the field is redrawn
+    when one of its `dirty` bits is set, at most once per period_ms (0: whenever dirty),
+    in font at x, y, padded to width pixels.
+
+    A byte row (size > 0) is allocation-free: source(gps, tz, dht, buf) writes exactly
+    size bytes of ASCII into buf and returns the colour. pre marks an HH:MM:SS byte row
+    whose next second is rendered ahead."""
+    __slots__ = ('source', 'x', 'y', 'font', 'width', 'dirty', 'period_ms', 'pre', 'size')
+
+    def __init__(self, source, x, y, font, width, dirty, period_ms=0, pre=PRE_NONE, size=0):
+        self.size = size
+        self.source = source
+        self.x = x
+        self.y = y
+        self.font = font
+        self.width = width
+        self.dirty = dirty
+        self.period_ms = period_ms
+        self.pre = pre
+
+
+_ZONE_B = DIRTY_SATS | DIRTY_FIX | DIRTY_POS | DIRTY_COORDS
+
+# Default layout: Zone A (big font) local and UTC lines, Zone B (small font) GPS info,
+# status and DHT22 reading. Position and coordinates change continuously while moving,
+# so they refresh at most every 5 s; the DHT22 is read every 2 s.
+LAYOUT = (
+    Field(_local_date, DATE_X, LINE1_Y, font_big, 126, DIRTY_DATE, size=10),
+    Field(_local_time, TIME_X, LINE1_Y, font_big, _TIME_CLEAR_W, DIRTY_TIME, pre=PRE_LOCAL, size=8),
+    Field(_tz_label, LABEL_X, LINE1_Y, font_big, 54, DIRTY_DATE),
+    Field(_utc_date, DATE_X, LINE2_Y, font_big, 126, DIRTY_DATE, size=10),
+    Field(_utc_time, TIME_X, LINE2_Y, font_big, _TIME_CLEAR_W, DIRTY_TIME, pre=PRE_UTC, size=8),
+    Field(_utc_label, LABEL_X, LINE2_Y, font_big, 54, 0),
+    Field(_sats, 8, ROW1_Y, font_small, 60, DIRTY_SATS, 2000, size=10),
+    Field(_fix, 96, ROW1_Y, font_small, 48, DIRTY_FIX, size=8),
+    Field(_lat, 8, ROW2_Y, font_small, 72, DIRTY_POS, 5000),
+    Field(_lon, 84, ROW2_Y, font_small, 78, DIRTY_POS, 5000),
+    Field(_grid, 168, ROW2_Y, font_small, 42, DIRTY_COORDS, 5000),
+    Field(_utm, 8, ROW3_Y, font_small, 130, DIRTY_COORDS, 5000),
+    Field(_status, STATUS_X, STATUS_Y, font_small, STATUS_CLEAR_W, _ZONE_B),
+    Field(_temp, 8, ROW4_Y, font_small, 42, DIRTY_DHT, 2000),
+    Field(_hum, 60, ROW4_Y, font_small, 36, DIRTY_DHT, 2000),
+)
+
 
 class DisplayManager:
-    __slots__ = ('_tft', '_cache', '_first_draw',
-                 '_last_siu', '_last_siv', '_last_fix_type', '_last_has_fix',
-                 '_last_temp', '_last_hum')
+    __slots__ = ('_tft', '_comp', '_layout', '_cache', '_bufs', '_shown', '_colors',
+                 '_pending', '_last_ms', '_first_draw', '_last_offset', '_last_abbr', '_glyphs',
+                 '_pre', '_pre_from', '_pre_to', '_pre_color', '_pre_x', '_pre_ok', '_pre_sec',
+                 '_pre_offset')
 
-    def __init__(self, tft):
-        self._tft = tft
-        self._cache = [None] * _NUM_KEYS
+    def __init__(self, tft, glyph_cache_bytes=0, composite=False, layout=LAYOUT):
+        """glyph_cache_bytes > 0 draws Zone A's big font from pre-coloured RGB565 glyphs
+        kept within that many bytes, instead of expanding the 1bpp font in write().
+        composite=True draws into a RAM copy of the screen and sends each frame's
+        coalesced dirty rectangles with blit_buffer() (about 120 KB of RAM).
+        layout is a sequence of Field rows; it defaults to LAYOUT."""
+        self._comp = Compositor(tft, SCREEN_W, SCREEN_H) if composite else None
+        self._tft = self._comp if composite else tft
+        self._glyphs = (GlyphCache(font_big, glyph_cache_bytes, _GLYPH_STAGE_W)
+                        if glyph_cache_bytes > 0 else None)
+        self._layout = layout
+        n = len(layout)
+        # Per field: last (text, color) drawn, pending redraw flag, ticks_ms of the last draw
+        self._cache = [None] * n
+        # Byte rows: buffer the source fills, bytes shown and their colour (-1: blank)
+        self._bufs = [bytearray(f.size) if f.size else None for f in layout]
+        self._shown = [bytearray(f.size) if f.size else None for f in layout]
+        self._colors = array('i', [-1] * n)
+        self._pending = bytearray(n)
+        self._last_ms = array('i', [0] * n)
         self._first_draw = True
-        # Raw value caches to skip formatting when unchanged
-        self._last_siu = -1
-        self._last_siv = -1
-        self._last_fix_type = -1
-        self._last_has_fix = None
-        self._last_temp = None
-        self._last_hum = None
+        # Timezone last drawn; a change redraws the local time and date
+        self._last_offset = None
+        self._last_abbr = None
+        # Next second's local and UTC time, rendered ahead into RAM, per PRE_* slot: the
+        # changed digits, the bytes shown when rendered, the next bytes, colour, x of the
+        # first changed digit and whether the rendering is usable
+        self._pre = [None, None]
+        for f in layout:
+            if f.pre != PRE_NONE:
+                self._pre[f.pre] = TextBuffer(f.font, f.width)
+        self._pre_from = (bytearray(8), bytearray(8))
+        self._pre_to = (bytearray(8), bytearray(8))
+        self._pre_color = array('i', (0, 0))
+        self._pre_x = array('i', (0, 0))
+        self._pre_ok = bytearray(2)
+        self._pre_sec = -1
+        self._pre_offset = 0
 
     def init_screen(self):
         """Clear screen and draw static elements."""
         self._tft.fill(BLACK)
         self._tft.hline(0, SEP_Y, SCREEN_W, GRAY)
         self._first_draw = True
-        for i in range(_NUM_KEYS):
+        for i in range(len(self._cache)):
             self._cache[i] = None
+            self._colors[i] = -1
+        self._pre_sec = -1
+        if self._comp is not None:
+            self._comp.flush()
+
+    @property
+    def compositor(self):
+        """The Compositor with the last frame's rects, blits, pixels and bytes, or None."""
+        return self._comp
+
+    def _write(self, font, text, x, y, color):
+        """Draw text with a BLACK background, from the glyph cache when it holds the font."""
+        if font is font_big and self._glyphs is not None:
+            self._glyphs.draw(self._tft, text, x, y, color, BLACK)
+        else:
+            self._tft.write(font, text, x, y, color, BLACK)
 
     def _draw_text(self, key, text, x, y, font, color, clear_width=0):
-        """Only redraw text if it has changed since last call with this key."""
+        """Only redraw text if it has changed since last call with this key.
+
+        The text is padded with spaces to the field's clear_width and drawn with an
+        opaque background, so stale pixels are overwritten in the same write().
+        Same colour as before: only the changed character cells are redrawn.
+        """
+        if clear_width > 0:
+            text = _pad(font, text, clear_width)
         prev = self._cache[key]
-        if prev is not None and prev[0] == text and prev[1] == color and not self._first_draw:
+        if prev is not None and prev[1] == color and not self._first_draw:
+            if prev[0] != text:
+                self._cache[key] = (text, color)
+                self._draw_changed(prev[0], text, x, y, font, color)
             return
         self._cache[key] = (text, color)
-        if clear_width > 0:
-            self._tft.fill_rect(x, y, clear_width, font.HEIGHT, BLACK)
+        # After init_screen() the field is already blank; otherwise only pixels the
+        # previous text covered beyond the new one need clearing
+        end = x + text_width(font, prev[0]) if prev is not None else x
         if text:
-            self._tft.write(font, text, x, y, color, BLACK)
+            self._write(font, text, x, y, color)
+            x += text_width(font, text)
+        if end > x:
+            self._tft.fill_rect(x, y, end - x, font.HEIGHT, BLACK)
+
+    def _draw_changed(self, prev, text, x, y, font, color):
+        """Redraw the cells of text that differ from prev, already drawn at x, y.
+
+        Runs of adjacent changed cells go out in one write() with an opaque background.
+        If a changed character has a different width, everything after it moves and is
+        redrawn. Pixels left over from a longer prev (wider than the padded field) are cleared.
+        """
+        tft = self._tft
+        end = x + text_width(font, prev)
+        n = len(text)
+        m = len(prev)
+        start = -1          # first index of the pending run of changed cells
+        run_x = x
+        i = 0
+        while i < n:
+            c = text[i]
+            w = char_width(font, c)
+            if i < m and prev[i] == c:
+                if start >= 0:
+                    self._write(font, text[start:i], run_x, y, color)
+                    start = -1
+            else:
+                if start < 0:
+                    start = i
+                    run_x = x
+                if i < m and char_width(font, prev[i]) != w:
+                    x = run_x + text_width(font, text[start:])
+                    break
+            x += w
+            i += 1
+        if start >= 0:
+            self._write(font, text[start:], run_x, y, color)
+        if end > x:
+            tft.fill_rect(x, y, end - x, font.HEIGHT, BLACK)
+
+    def _draw_run(self, font, buf, a, b, x, y, color):
+        """Draw cells buf[a:b] of a byte row at x, y with one write() or blit_buffer()."""
+        if font is font_big and self._glyphs is not None:
+            self._glyphs.draw(self._tft, buf, x, y, color, BLACK, a, b)
+            return
+        n = b - a
+        c = buf[a]
+        if n == 1:
+            text = _CHARS[c]
+        elif n == 2 and 48 <= c <= 57 and 48 <= buf[a + 1] <= 57:
+            text = _DIGIT_PAIRS[(c - 48) * 10 + buf[a + 1] - 48]
+        else:
+            text = bytes(buf[a:b])
+        self._tft.write(font, text, x, y, color, BLACK)
+
+    def _draw_bytes(self, i, f, color):
+        """Draw byte row i where its buffer differs from the bytes shown.
+
+        Each run of adjacent changed cells goes out in one call (_draw_run). Single cells
+        and two-digit runs, all a ticking clock needs, use preallocated strings, so they
+        allocate nothing. A cell whose width changes moves the cells after it, which are
+        then redrawn too; pixels left over from wider old text are cleared.
+        """
+        buf = self._bufs[i]
+        shown = self._shown[i]
+        font = f.font
+        cmap = code_map(font)
+        widths = font.WIDTHS
+        x = f.x
+        y = f.y
+        had = self._colors[i] >= 0
+        redraw = not had or self._colors[i] != color or self._first_draw
+        end = x
+        run = -1
+        run_x = x
+        n = len(buf)
+        for k in range(n):
+            c = buf[k]
+            g = cmap[c] - 1 if c < 128 else -1
+            w = widths[g] if g >= 0 else 0
+            if had:
+                o = cmap[shown[k]] - 1 if shown[k] < 128 else -1
+                ow = widths[o] if o >= 0 else 0
+                end += ow
+            if redraw or c != shown[k]:
+                if had and not redraw and w != ow:
+                    redraw = True
+                if run < 0:
+                    run = k
+                    run_x = x
+                shown[k] = c
+            elif run >= 0:
+                self._draw_run(font, buf, run, k, run_x, y, color)
+                run = -1
+            x += w
+        if run >= 0:
+            self._draw_run(font, buf, run, n, run_x, y, color)
+        self._colors[i] = color
+        if end > x:
+            self._tft.fill_rect(x, y, end - x, font.HEIGHT, BLACK)
+
+    def _blank_bytes(self, i, f):
+        """Clear byte row i if anything is shown."""
+        if self._colors[i] >= 0:
+            self._tft.fill_rect(f.x, f.y, text_width(f.font, self._shown[i]), f.font.HEIGHT, BLACK)
+            self._colors[i] = -1
+
+    def _blit_pre(self, i, f, color):
+        """Blit row i's pre-rendered digits if they turn the bytes shown into its buffer."""
+        p = f.pre
+        if p == PRE_NONE or not self._pre_ok[p] or self._first_draw:
+            return False
+        shown = self._shown[i]
+        buf = self._bufs[i]
+        if (self._colors[i] != color or self._pre_color[p] != color
+                or self._pre_from[p] != shown or self._pre_to[p] != buf):
+            return False
+        self._pre[p].blit(self._tft, self._pre_x[p], f.y)
+        put_bytes(shown, 0, buf)
+        self._pre_ok[p] = 0
+        return True
 
     def update(self, gps, tz, dht=None):
-        """Refresh all display regions with current GPS and timezone data."""
-        if gps.time_is_valid:
-            tz.update_dst(gps.utc_year, gps.utc_month, gps.utc_day, gps.hours)
-        self._update_time(gps, tz)
-        self._update_gps_info(gps, tz)
+        """Redraw the layout fields that are pending and due, then acknowledge the GPS dirty bits.
+
+        A field becomes pending when one of its dirty bits is set (DIRTY_DHT whenever dht
+        is given) and is drawn once its period has passed since its last draw; fields not
+        drawn skip their source entirely. DST is re-evaluated when the time or date changes
+        and right after a zone change. A timezone change marks the time and date dirty;
+        the first draw draws everything.
+        """
+        dirty = gps.dirty
+        if (dirty & (DIRTY_TIME | DIRTY_DATE) or tz.dst_stale) and gps.time_is_valid:
+            tz.update_dst(gps.instant)
+        if tz.offset != self._last_offset or tz.abbreviation != self._last_abbr:
+            self._last_offset = tz.offset
+            self._last_abbr = tz.abbreviation
+            dirty |= DIRTY_TIME | DIRTY_DATE
+        gps.ack(dirty)
         if dht is not None:
-            self._update_dht(dht)
+            dirty |= DIRTY_DHT
+
+        first = self._first_draw
+        now = time.ticks_ms()
+        layout = self._layout
+        pending = self._pending
+        last = self._last_ms
+        for i in range(len(layout)):
+            f = layout[i]
+            if first or f.dirty & dirty:
+                pending[i] = 1
+            elif not pending[i]:
+                continue
+            if not first and f.period_ms and time.ticks_diff(now, last[i]) < f.period_ms:
+                continue
+            pending[i] = 0
+            if f.size:
+                color = f.source(gps, tz, dht, self._bufs[i])
+                if color < 0:
+                    self._blank_bytes(i, f)
+                else:
+                    last[i] = now
+                    if not self._blit_pre(i, f, color):
+                        self._draw_bytes(i, f, color)
+                continue
+            v = f.source(gps, tz, dht)
+            if v is None:
+                # Blank, not drawn: the field stays due for when it has content
+                self._cache[i] = _EMPTY
+            else:
+                last[i] = now
+                self._draw_text(i, v[0], f.x, f.y, f.font, v[1], clear_width=f.width)
         self._first_draw = False
+        if self._comp is not None:
+            self._comp.flush()
 
-    def _update_time(self, gps, tz):
-        """Draw local time + TZ + date, and UTC time + date."""
-        if gps.time_is_valid:
-            local_time = gps.time_str(tz.offset)
-            utc_time = gps.time_str(0)
-            time_color = WHITE
-            utc_color = GRAY
-            date_color = YELLOW
-            utc_date_color = GRAY
-        else:
-            local_time = "--:--:--"
-            utc_time = "--:--:--"
-            time_color = GRAY
-            utc_color = GRAY
-            date_color = GRAY
-            utc_date_color = GRAY
-
-        local_date = gps.date_str(tz.offset)
-        utc_date = gps.date_str(0)
-
-        # Line 1: date + local time + TZ
-        self._draw_text(_K_LOCAL_DATE, local_date, DATE_X, LINE1_Y,
-                         font_big, date_color, clear_width=126)
-        self._draw_text(_K_TIME, local_time, TIME_X, LINE1_Y,
-                         font_big, time_color, clear_width=102)
-        self._draw_text(_K_TZ, tz.abbreviation, LABEL_X, LINE1_Y,
-                         font_big, CYAN, clear_width=54)
-
-        # Line 2: date + UTC time + "UTC"
-        self._draw_text(_K_UTC_DATE, utc_date, DATE_X, LINE2_Y,
-                         font_big, utc_date_color, clear_width=126)
-        self._draw_text(_K_UTC_TIME, utc_time, TIME_X, LINE2_Y,
-                         font_big, utc_color, clear_width=102)
-        self._draw_text(_K_UTC_LABEL, "UTC", LABEL_X, LINE2_Y,
-                         font_big, CYAN, clear_width=54)
-
-    def _update_gps_info(self, gps, tz):
-        """Draw GPS info in Zone B: satellites, fix, coords, grid."""
-        if not gps.has_ever_had_fix:
-            self._draw_text(_K_STATUS, "Acquiring satellites...",
-                             STATUS_X, STATUS_Y, font_small, ORANGE,
-                             clear_width=STATUS_CLEAR_W)
-            for k in (_K_SATS, _K_FIX, _K_LAT, _K_LON, _K_GRID, _K_UTM):
-                self._cache[k] = _EMPTY
+    def prerender(self, gps, tz):
+        """Render the next second's local and UTC time into RAM; call while the loop is idle.
+
+        Only the digits that will change are rendered, so at the boundary the visible
+        update is a single blit_buffer() per line.
+        """
+        if self._first_draw or not gps.time_is_valid:
+            return
+        s = gps.seconds
+        offset = tz.offset
+        if s == self._pre_sec and offset == self._pre_offset:
             return
+        self._pre_sec = s
+        self._pre_offset = offset
+        sod = gps.second_of_day + 1
+        layout = self._layout
+        for i in range(len(layout)):
+            f = layout[i]
+            if f.pre != PRE_NONE:
+                t = local_sod(sod, offset if f.pre == PRE_LOCAL else 0)
+                hms(self._pre_to[f.pre], t // 3600, t // 60 % 60, t % 60)
+                self._prerender_field(i, f)
 
-        # Clear acquiring message when we first get a fix
-        self._draw_text(_K_STATUS, "", STATUS_X, STATUS_Y,
-                         font_small, BLACK, clear_width=STATUS_CLEAR_W)
-
-        # Row 1: Sat:U/V | Fix:type
-        siu = gps.satellites_in_use
-        siv = gps.satellites_in_view
-        if siu != self._last_siu or siv != self._last_siv or self._first_draw:
-            self._last_siu = siu
-            self._last_siv = siv
-            self._draw_text(_K_SATS, "Sat:{}/{}".format(siu, siv), 8, ROW1_Y,
-                             font_small, WHITE, clear_width=60)
-
-        ft = gps.fix_type_str
-        hf = gps.has_fix
-        if ft != self._last_fix_type or hf != self._last_has_fix or self._first_draw:
-            self._last_fix_type = ft
-            self._last_has_fix = hf
-            self._draw_text(_K_FIX, "Fix:{}".format(ft), 96, ROW1_Y,
-                             font_small, GREEN if hf else RED, clear_width=48)
-
-        # Row 2: Lat | Lon | Grid
-        if gps.has_fix:
-            lat_text = gps.lat_str()
-            lon_text = gps.lon_str()
-            grid_text = gps.maidenhead
-            utm_text = gps.utm
-            coord_color = WHITE
-        else:
-            lat_text = "-- N"
-            lon_text = "-- W"
-            grid_text = "------"
-            utm_text = "-- --E --N"
-            coord_color = GRAY
-
-        self._draw_text(_K_LAT, lat_text, 8, ROW2_Y,
-                         font_small, coord_color, clear_width=72)
-        self._draw_text(_K_LON, lon_text, 84, ROW2_Y,
-                         font_small, coord_color, clear_width=78)
-        self._draw_text(_K_GRID, grid_text, 168, ROW2_Y,
-                         font_small, CYAN, clear_width=42)
-
-        # Row 3: UTM
-        self._draw_text(_K_UTM, utm_text, 8, ROW3_Y,
-                         font_small, coord_color, clear_width=130)
-
-        # Signal lost warning
-        if not gps.has_fix:
-            self._draw_text(_K_STATUS, "Signal lost",
-                             STATUS_X, STATUS_Y, font_small, RED,
-                             clear_width=STATUS_CLEAR_W)
-
-    def _update_dht(self, dht):
-        """Draw temperature and humidity on ROW4."""
-        if dht.has_reading:
-            t = dht.temperature_f
-            h = dht.humidity
-            if t != self._last_temp or h != self._last_hum or self._first_draw:
-                self._last_temp = t
-                self._last_hum = h
-                self._draw_text(_K_TEMP, "{:.1f}F".format(t), 8, ROW4_Y,
-                                 font_small, WHITE, clear_width=42)
-                self._draw_text(_K_HUM, "{:.1f}%".format(h), 60, ROW4_Y,
-                                 font_small, WHITE, clear_width=36)
-        elif self._last_temp is not None or self._first_draw:
-            self._last_temp = None
-            self._last_hum = None
-            self._draw_text(_K_TEMP, "--.-F", 8, ROW4_Y,
-                             font_small, GRAY, clear_width=42)
-            self._draw_text(_K_HUM, "--.-%", 60, ROW4_Y,
-                             font_small, GRAY, clear_width=36)
+    def _prerender_field(self, i, f):
+        """Render the digits of _pre_to that differ from what row i shows, in its current colour."""
+        p = f.pre
+        self._pre_ok[p] = 0
+        color = self._colors[i]
+        if color < 0:
+            return
+        shown = self._shown[i]
+        nxt = self._pre_to[p]
+        font = f.font
+        start = 0
+        x = f.x
+        while start < len(nxt) and nxt[start] == shown[start]:
+            x += char_width(font, nxt[start])
+            start += 1
+        # The blit must cover everything that changes: same overall width, something new
+        if start == len(nxt) or text_width(font, shown) != text_width(font, nxt):
+            return
+        if self._pre[p].render(nxt, color, BLACK, start):
+            put_bytes(self._pre_from[p], 0, shown)
+            self._pre_color[p] = color
+            self._pre_x[p] = x
+            self._pre_ok[p] = 1
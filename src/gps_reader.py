@@ -1,34 +1,106 @@
-"""UART GPS reader wrapping micropyGPS for the BN-220 module."""
+"""UART GPS reader wrapping micropyGPS (or the UBX parser) for the BN-220 module."""
 
 import sys
+import time
 from machine import UART, Pin
-from micropyGPS import MicropyGPS
+from micropyGPS import (MicropyGPS, MASK_ALL, SNAP_HOUR, SNAP_MINUTE, SNAP_HUNDREDTHS,
+                        SNAP_DAY, SNAP_MONTH, SNAP_YEAR, SNAP_LAT_DEG, SNAP_LAT_MIN,
+                        SNAP_LAT_HEMI, SNAP_LON_DEG, SNAP_LON_MIN, SNAP_LON_HEMI,
+                        SNAP_VALID, SNAP_FIX_TYPE, SNAP_SIU, SNAP_SIV, SNAP_TIME_VALID,
+                        SNAP_SIZE)
+from array import array
+from latency import LatencyModel
+from digit_fmt import hms, ymd, put_bytes
+from utc_clock import (UTCClock, CHANGED_TIME, CHANGED_DATE, CLK_HOUR, CLK_MINUTE,
+                       CLK_SECOND, CLK_DAY, CLK_MONTH, CLK_YEAR, CLK_DAYS, CLK_SOD)
+from time_core import civil_from_days, instant, local_day, local_sod
 import math
 
-# Days per month (non-leap / leap year index 1 for Feb)
-_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+# UART receive buffer size (driver rxbuf and our readinto() chunk)
+_RX_BUF = 512
 
+# UART silence that ends an epoch's sentence burst (ms)
+_EPOCH_GAP_MS = 40
 
-def _is_leap_year(y):
-    return (y % 4 == 0 and y % 100 != 0) or (y % 400 == 0)
+# Consecutive epochs with receiver-valid time, each a small forward step from
+# the last, needed before time is shown without a position fix
+_TIME_CONFIRM_EPOCHS = 3
+_TIME_MAX_STEP = 1000          # hundredths of a second (10 s)
+_HUNDREDTHS_PER_DAY = 8640000
 
+# Dirty-field bits (GPSReader.dirty): set when a logical field changes,
+# cleared by the consumer with ack()
+DIRTY_TIME = 0x01      # HH:MM:SS
+DIRTY_DATE = 0x02      # UTC date or minute (local date may roll over)
+DIRTY_SATS = 0x04      # satellites in use / in view
+DIRTY_FIX = 0x08       # fix type, fix valid, ever-had-fix
+DIRTY_POS = 0x10       # latitude / longitude
+DIRTY_COORDS = 0x20    # derived Maidenhead / UTM
+DIRTY_ALL = 0x3F
 
-def _days_in_month(month, year):
-    if month == 2 and _is_leap_year(year):
-        return 29
-    return _DAYS_IN_MONTH[month - 1]
+# Hemisphere byte stored by the parser -> display letter
+_HEMISPHERE = {78: 'N', 83: 'S', 69: 'E', 87: 'W'}
+
+# Shown until the receiver has reported a date
+_NO_DATE = b"----.--.--"
 
 
 class GPSReader:
-    __slots__ = ('_uart', '_gps', '_has_ever_had_fix',
+    __slots__ = ('_uart', '_gps', '_rx', '_rx_mv', '_ring', '_rx_paused', '_has_ever_had_fix',
+                 '_last_rx', '_epoch_seen',
+                 '_has_ever_had_time', '_time_key', '_time_run', '_clock', '_burst_us', '_pps',
+                 '_us_per_byte', '_latency',
+                 '_dirty', '_prev',
                  '_lat_mins', '_lat_dec', '_lon_mins', '_lon_dec',
                  '_cached_mh_lat', '_cached_mh_lon', '_cached_mh',
-                 '_cached_utm_lat', '_cached_utm_lon', '_cached_utm')
-
-    def __init__(self, tx_pin=1, rx_pin=2, baudrate=9600):
-        self._uart = UART(1, baudrate=baudrate, tx=Pin(tx_pin), rx=Pin(rx_pin), rxbuf=512)
-        self._gps = MicropyGPS()
+                 '_cached_utm_lat', '_cached_utm_lon', '_cached_utm',
+                 '_date_keys', '_date_bufs', '_date_last', '_date_ymd')
+
+    def __init__(self, tx_pin=1, rx_pin=2, baudrate=9600, sentence_mask=MASK_ALL,
+                 irq_rx=False, ring_size=2048, ubx=False, pps_pin=None):
+        self._uart = UART(1, baudrate=baudrate, tx=Pin(tx_pin), rx=Pin(rx_pin), rxbuf=_RX_BUF)
+        if ubx:
+            # Binary NAV-PVT / NAV-SAT instead of NMEA; the receiver must be configured for it
+            from ubx import UBXParser
+            self._gps = UBXParser()
+        else:
+            self._gps = MicropyGPS(sentence_mask)
+        if irq_rx:
+            # UART RX interrupt moves bytes into a ring; feed() parses whatever has arrived
+            from rx_ring import RxRing
+            self._ring = RxRing(self._uart, ring_size, _EPOCH_GAP_MS)
+            self._rx = None
+            self._rx_mv = None
+        else:
+            # Preallocated receive chunk shared by the parser and the USB passthrough
+            self._ring = None
+            self._rx = bytearray(_RX_BUF)
+            self._rx_mv = memoryview(self._rx)
+        self._rx_paused = False
         self._has_ever_had_fix = False
+        # Time validity is tracked apart from the fix: UTC is usually known much earlier
+        self._has_ever_had_time = False
+        self._time_key = -1
+        self._time_run = 0
+        self._last_rx = time.ticks_ms()
+        self._epoch_seen = 0
+        # Displayed time runs from this clock, synced at each epoch and free-running between
+        self._clock = UTCClock()
+        # ticks_us() when the first byte of the current sentence burst arrived, back-dated
+        # by the bytes already queued when it was noticed (10 bits each on the wire)
+        self._burst_us = time.ticks_us()
+        self._us_per_byte = 10000000 // baudrate
+        # Receiver output delay after the true second, from burst arrival history
+        self._latency = LatencyModel()
+        if pps_pin is not None:
+            # Receiver PPS edges anchor the clock instead of sentence arrival
+            from pps import PPS
+            self._pps = PPS(pps_pin)
+        else:
+            self._pps = None
+        # Changed-field bits and the snapshot they were computed against
+        self._dirty = DIRTY_ALL
+        self._prev = array('i', [0] * SNAP_SIZE)
 
         # Cached decimal coordinates
         self._lat_mins = None
@@ -46,50 +118,254 @@ class GPSReader:
         self._cached_utm_lon = None
         self._cached_utm = "-- --E --N"
 
+        # Cached dates: two slots (local and UTC) of a day number and its YYYY-MM-DD
+        self._date_keys = array('i', (-1, -1))
+        self._date_bufs = (bytearray(10), bytearray(10))
+        self._date_last = 0
+        self._date_ymd = array('i', (0, 0, 0))
+
     def feed(self):
-        """Drain UART buffer, feed bytes to the parser, and echo to USB."""
-        n = self._uart.any()
-        if n:
-            buf = self._uart.read(n)
-            if buf:
-                for b in buf:
-                    self._gps.update(b)
-                try:
-                    sys.stdout.buffer.write(buf)
-                except:
-                    pass
-        if not self._has_ever_had_fix and self._gps.valid:
-            self._has_ever_had_fix = True
-
-    # --- Time ---
+        """Drain received bytes, feed them to the parser, and echo to USB.
+
+        Polled mode reads with readinto() into a preallocated buffer; IRQ mode
+        consumes whatever the RX interrupt has put in the ring. Either way the
+        parser scans the buffer in place and the passthrough writes a memoryview.
+        Publishes the open epoch once the UART has been quiet for _EPOCH_GAP_MS,
+        syncs the clock to it, and advances the clock between epochs.
+        Returns True if a new snapshot was published since the last call.
+        """
+        gps = self._gps
+        ring = self._ring
+        if ring is not None:
+            got = False
+            self._burst_us = time.ticks_add(ring.burst_us, -ring.burst_bytes * self._us_per_byte)
+            for _ in range(2):  # a run that wraps the ring takes two passes
+                start = ring.tail
+                end = ring.readable()
+                if end == start:
+                    break
+                self._ingest(ring.buf, ring.mv, start, end)
+                ring.advance(end)
+                got = True
+            last_rx = ring.last_rx
+        else:
+            got = False
+            queued = self._uart.any()
+            if queued:
+                n = self._uart.readinto(self._rx, min(queued, _RX_BUF))
+                if n:
+                    now = time.ticks_ms()
+                    if time.ticks_diff(now, self._last_rx) >= _EPOCH_GAP_MS:
+                        self._burst_us = time.ticks_add(time.ticks_us(), -queued * self._us_per_byte)
+                    self._last_rx = now
+                    self._ingest(self._rx, self._rx_mv, 0, n)
+                    got = True
+            last_rx = self._last_rx
+        if not got and time.ticks_diff(time.ticks_ms(), last_rx) >= _EPOCH_GAP_MS:
+            gps.end_epoch()
+
+        published = gps.epoch != self._epoch_seen
+        if published:
+            self._epoch_seen = gps.epoch
+            self._dirty |= self._diff_snapshot()
+            if not self._has_ever_had_time and self._check_time():
+                self._has_ever_had_time = True
+                self._dirty |= DIRTY_TIME | DIRTY_DATE
+            snap = gps.snapshot
+            if not self._has_ever_had_fix and snap[SNAP_VALID]:
+                self._has_ever_had_fix = True
+                self._has_ever_had_time = True
+                self._dirty = DIRTY_ALL
+            if self._has_ever_had_time and (snap[SNAP_TIME_VALID] or snap[SNAP_VALID]):
+                self._sync_clock(snap)
+
+        changed = self._clock.update()
+        if changed & CHANGED_TIME:
+            self._dirty |= DIRTY_TIME
+        if changed & CHANGED_DATE:
+            self._dirty |= DIRTY_DATE
+        return published
+
+    def _sync_clock(self, snap):
+        """Anchor the clock to the published epoch: at the PPS edge that began its second when one
+        matches, otherwise at its first byte's arrival less the modelled receiver delay. While PPS is
+        locked, epochs without a pulse (fractional seconds at higher rates) leave the edge-based
+        anchor alone; matched pulses calibrate the model's minimum delay for when PPS drops out.
+        The arrival time is the burst that opened the epoch, not the one that published it."""
+        burst = self._gps.epoch_mark
+        ms = (snap[SNAP_HOUR] * 60 + snap[SNAP_MINUTE]) * 60000 + snap[SNAP_HUNDREDTHS] * 10
+        t_us = self._latency.add(burst, ms)
+        pps = self._pps
+        if pps is not None:
+            edge = pps.match(burst) if snap[SNAP_HUNDREDTHS] % 100 == 0 else -1
+            if edge >= 0:
+                self._latency.floor_us = pps.latency.min_us
+                t_us = edge
+            elif pps.locked:
+                return
+        self._clock.sync(snap[SNAP_HOUR], snap[SNAP_MINUTE], snap[SNAP_HUNDREDTHS],
+                         snap[SNAP_DAY], snap[SNAP_MONTH], snap[SNAP_YEAR], t_us)
+
+    def _check_time(self):
+        """True once the receiver has flagged its time valid for _TIME_CONFIRM_EPOCHS epochs in a row,
+        each advancing by no more than _TIME_MAX_STEP. Rejects a stale RTC time that is not running."""
+        snap = self._gps.snapshot
+        if not snap[SNAP_TIME_VALID]:
+            self._time_run = 0
+            return False
+        key = (snap[SNAP_HOUR] * 60 + snap[SNAP_MINUTE]) * 6000 + snap[SNAP_HUNDREDTHS]
+        step = (key - self._time_key) % _HUNDREDTHS_PER_DAY
+        if self._time_run and 0 < step <= _TIME_MAX_STEP:
+            self._time_run += 1
+        else:
+            self._time_run = 1
+        self._time_key = key
+        return self._time_run >= _TIME_CONFIRM_EPOCHS
+
+    def _diff_snapshot(self):
+        """Compare the published snapshot with the last one seen; return its dirty bits.
+        Time and date bits come from the clock instead, as the displayed second advances."""
+        snap = self._gps.snapshot
+        prev = self._prev
+        d = 0
+        if snap[SNAP_SIU] != prev[SNAP_SIU] or snap[SNAP_SIV] != prev[SNAP_SIV]:
+            d |= DIRTY_SATS
+        if snap[SNAP_VALID] != prev[SNAP_VALID] or snap[SNAP_FIX_TYPE] != prev[SNAP_FIX_TYPE]:
+            # Fix validity switches coordinates between values and placeholders
+            d |= DIRTY_FIX | DIRTY_POS | DIRTY_COORDS
+        for i in range(SNAP_LAT_DEG, SNAP_LON_HEMI + 1):
+            if snap[i] != prev[i]:
+                d |= DIRTY_POS | DIRTY_COORDS
+                break
+        for i in range(SNAP_SIZE):
+            prev[i] = snap[i]
+        return d
+
+    @property
+    def dirty(self):
+        """Bitmask of DIRTY_* fields changed since the consumer last acknowledged them."""
+        return self._dirty
+
+    def ack(self, mask=DIRTY_ALL):
+        """Clear the given dirty bits once the consumer has handled them."""
+        self._dirty &= ~mask
+
+    def _ingest(self, buf, mv, start, end):
+        """Parse buf[start:end] and echo the same bytes to USB. An epoch opened by these
+        bytes is tagged with the current burst's arrival time."""
+        self._gps.mark = self._burst_us
+        self._gps.feed_bytes(buf, start, end)
+        try:
+            sys.stdout.buffer.write(mv[start:end])
+        except:
+            pass
+
+    @property
+    def uart(self):
+        """The receiver UART, for configuration commands at boot."""
+        return self._uart
+
+    def set_baudrate(self, baudrate):
+        """Reopen the UART at a new baud rate (after the receiver was switched)."""
+        self._uart.init(baudrate=baudrate)
+        self._us_per_byte = 10000000 // baudrate
+        if self._ring is not None and not self._rx_paused:
+            self._ring.attach(self._uart)
+
+    def pause_rx(self):
+        """IRQ mode: remove the receive handler so the UART can be read directly
+        (receiver configuration at boot); no-op when polling."""
+        if self._ring is not None:
+            self._uart.irq(handler=None)
+            self._rx_paused = True
+
+    def resume_rx(self):
+        """IRQ mode: reinstall the receive handler after pause_rx()."""
+        if self._ring is not None:
+            self._rx_paused = False
+            self._ring.attach(self._uart)
+
+    @property
+    def rx_overflows(self):
+        """IRQ mode: receive interrupts that found the ring full (0 when polling)."""
+        return self._ring.overflows if self._ring is not None else 0
+
+    @property
+    def rx_dropped(self):
+        """IRQ mode: bytes discarded because the ring was full (0 when polling)."""
+        return self._ring.dropped if self._ring is not None else 0
+
+    @property
+    def epoch(self):
+        """Count of published snapshots; changes when new GPS data is available."""
+        return self._gps.epoch
+
+    # --- Time (from the free-running clock, not the raw snapshot) ---
+
+    @property
+    def clock(self):
+        """The UTCClock behind the time and date accessors (drift, holdover)."""
+        return self._clock
+
+    @property
+    def latency(self):
+        """Receiver output delay model; .stats has mean_us / jitter_us of the delay after the second."""
+        return self._latency
+
+    @property
+    def pps(self):
+        """The PPS input (pulse count, lock, NMEA-to-PPS latency stats), or None."""
+        return self._pps
 
     @property
     def hours(self):
-        return self._gps.timestamp[0]
+        return self._clock.now[CLK_HOUR]
 
     @property
     def minutes(self):
-        return self._gps.timestamp[1]
+        return self._clock.now[CLK_MINUTE]
 
     @property
     def seconds(self):
-        return int(self._gps.timestamp[2])
+        return self._clock.now[CLK_SECOND]
+
+    @property
+    def second_of_day(self):
+        return self._clock.now[CLK_SOD]
+
+    @property
+    def day_number(self):
+        """UTC date as days since 2000-01-01 (see time_core)."""
+        return self._clock.now[CLK_DAYS]
+
+    @property
+    def instant(self):
+        """Current UTC second as seconds since 2000-01-01 00:00."""
+        now = self._clock.now
+        return instant(now[CLK_DAYS], now[CLK_SOD])
 
     @property
     def time_is_valid(self):
-        """True if we have ever received a valid fix (time keeps running)."""
-        return self._has_ever_had_fix
+        """True once UTC has been trustworthy, from a fix or from confirmed receiver time.
+        Stays set through signal loss (time keeps running)."""
+        return self._has_ever_had_time
+
+    def time_into(self, buf, tz_offset=0):
+        """Write HH:MM:SS adjusted for a timezone offset in minutes into buf[0:8] (no allocation)."""
+        t = local_sod(self._clock.now[CLK_SOD], tz_offset)
+        hms(buf, t // 3600, t // 60 % 60, t % 60)
 
     def time_str(self, tz_offset=0):
-        """Return HH:MM:SS string adjusted for timezone offset."""
-        h = (self.hours + tz_offset) % 24
-        return "{:02d}:{:02d}:{:02d}".format(h, self.minutes, self.seconds)
+        """Return HH:MM:SS string adjusted for a timezone offset in minutes."""
+        buf = bytearray(8)
+        self.time_into(buf, tz_offset)
+        return str(buf, 'ascii')
 
     # --- Fix info ---
 
     @property
     def has_fix(self):
-        return self._gps.valid
+        return self._gps.snapshot[SNAP_VALID] != 0
 
     @property
     def has_ever_had_fix(self):
@@ -97,11 +373,11 @@ class GPSReader:
 
     @property
     def fix_type(self):
-        return self._gps.fix_type
+        return self._gps.snapshot[SNAP_FIX_TYPE]
 
     @property
     def fix_type_str(self):
-        ft = self._gps.fix_type
+        ft = self._gps.snapshot[SNAP_FIX_TYPE]
         if ft == 3:
             return "3D"
         elif ft == 2:
@@ -110,66 +386,69 @@ class GPSReader:
 
     @property
     def satellites_in_use(self):
-        return self._gps.satellites_in_use
+        return self._gps.snapshot[SNAP_SIU]
 
     @property
     def satellites_in_view(self):
-        return self._gps.satellites_in_view
+        return self._gps.snapshot[SNAP_SIV]
 
     # --- Date ---
 
     @property
     def utc_year(self):
-        return 2000 + self._gps.date[2]
+        return 2000 + self._clock.now[CLK_YEAR]
 
     @property
     def utc_month(self):
-        return self._gps.date[1]
+        return self._clock.now[CLK_MONTH]
 
     @property
     def utc_day(self):
-        return self._gps.date[0]
+        return self._clock.now[CLK_DAY]
 
     def date_str(self, tz_offset=0):
-        """Return YYYY-MM-DD adjusted for timezone offset (handles midnight crossing)."""
-        d, m, y = self._gps.date  # (day, month, 2-digit year)
-        if d == 0 and m == 0 and y == 0:
-            return "----.--.--"
-        year = 2000 + y
-        utc_hour = self._gps.timestamp[0]
-        local_hour = utc_hour + tz_offset
-
-        if local_hour < 0:
-            # Previous day
-            d -= 1
-            if d < 1:
-                m -= 1
-                if m < 1:
-                    m = 12
-                    year -= 1
-                d = _days_in_month(m, year)
-        elif local_hour >= 24:
-            # Next day
-            d += 1
-            if d > _days_in_month(m, year):
-                d = 1
-                m += 1
-                if m > 12:
-                    m = 1
-                    year += 1
-
-        return "{:04d}-{:02d}-{:02d}".format(year, m, d)
+        """Return YYYY-MM-DD adjusted for a timezone offset in minutes (handles midnight crossing)."""
+        buf = bytearray(10)
+        self.date_into(buf, tz_offset)
+        return str(buf, 'ascii')
+
+    def date_into(self, buf, tz_offset=0):
+        """Write YYYY-MM-DD adjusted for a timezone offset in minutes into buf[0:10] (no allocation).
+
+        The local day number is all the date depends on, so each day is converted and
+        formatted once and then copied from a two-slot cache (local and UTC rows).
+        """
+        now = self._clock.now
+        if now[CLK_DAYS] < 0:
+            put_bytes(buf, 0, _NO_DATE)
+            return
+        day = local_day(now[CLK_DAYS], now[CLK_SOD], tz_offset)
+        keys = self._date_keys
+        if keys[0] == day:
+            k = 0
+        elif keys[1] == day:
+            k = 1
+        else:
+            # Replace the slot not used last; local and UTC lookups alternate
+            k = 1 - self._date_last
+            keys[k] = day
+            c = self._date_ymd
+            civil_from_days(day, c)
+            ymd(self._date_bufs[k], c[0], c[1], c[2])
+        self._date_last = k
+        put_bytes(buf, 0, self._date_bufs[k])
 
     # --- Position ---
 
     @property
     def latitude_decimal(self):
         """Return latitude in decimal degrees (positive N, negative S). Cached."""
-        lat = self._gps._latitude
-        if lat[1] != self._lat_mins:
-            self._lat_mins = lat[1]
-            dec = lat[0] + lat[1] / 60.0
-            if lat[2] == 'S':
+        snap = self._gps.snapshot
+        mins = snap[SNAP_LAT_MIN]
+        if mins != self._lat_mins:
+            self._lat_mins = mins
+            dec = snap[SNAP_LAT_DEG] + mins / 600000.0
+            if snap[SNAP_LAT_HEMI] == 83:  # 'S'
                 dec = -dec
             self._lat_dec = dec
         return self._lat_dec
@@ -177,22 +456,23 @@ class GPSReader:
     @property
     def longitude_decimal(self):
         """Return longitude in decimal degrees (positive E, negative W). Cached."""
-        lon = self._gps._longitude
-        if lon[1] != self._lon_mins:
-            self._lon_mins = lon[1]
-            dec = lon[0] + lon[1] / 60.0
-            if lon[2] == 'W':
+        snap = self._gps.snapshot
+        mins = snap[SNAP_LON_MIN]
+        if mins != self._lon_mins:
+            self._lon_mins = mins
+            dec = snap[SNAP_LON_DEG] + mins / 600000.0
+            if snap[SNAP_LON_HEMI] == 87:  # 'W'
                 dec = -dec
             self._lon_dec = dec
         return self._lon_dec
 
     def lat_str(self):
         """Formatted latitude string like '40.712800 N'."""
-        return "{:.6f} {}".format(abs(self.latitude_decimal), self._gps._latitude[2])
+        return "{:.6f} {}".format(abs(self.latitude_decimal), _HEMISPHERE[self._gps.snapshot[SNAP_LAT_HEMI]])
 
     def lon_str(self):
         """Formatted longitude string like '74.006000 W'."""
-        return "{:.6f} {}".format(abs(self.longitude_decimal), self._gps._longitude[2])
+        return "{:.6f} {}".format(abs(self.longitude_decimal), _HEMISPHERE[self._gps.snapshot[SNAP_LON_HEMI]])
 
     # --- Maidenhead grid locator ---
 
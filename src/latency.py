@@ -0,0 +1,115 @@
+"""Receiver output delay model: when did the epoch's second really start?
+
+Without PPS the only timing signal is when an epoch's first byte arrives.
+Arrival minus epoch time drifts by the receiver's variable output delay
+(processing, sentence scheduling, serial queueing). Over a sliding window
+the earliest arrival marks the receiver's minimum delay, so each epoch's
+delay is its offset above that lower envelope plus the minimum delay
+itself (a receiver constant, calibrated from PPS when one is wired).
+"""
+
+import time
+from array import array
+
+_DAY_MS = 86400000
+
+# Epochs in the lower-envelope window
+_WINDOW = 32
+
+# Rebase offsets well inside the ticks_us() half-period (us)
+_REBASE_US = 200000000
+
+# A gap this long between epochs restarts the model (ms)
+_RESET_MS = 60000
+
+# An offset beyond this means the receiver time stepped; restart the model (us)
+_MAX_OFFSET_US = 5000000
+
+# Minimum output delay of a u-blox M8 after the second (us), until calibrated
+DEFAULT_FLOOR_US = 40000
+
+
+class LatencyStats:
+    """Running delay statistics in microseconds: exponential mean and mean
+    absolute deviation (jitter) with weight 1/8, plus the extremes."""
+    __slots__ = ('count', 'mean_us', 'jitter_us', 'min_us', 'max_us')
+
+    def __init__(self):
+        self.count = 0
+        self.mean_us = 0
+        self.jitter_us = 0
+        self.min_us = 0
+        self.max_us = 0
+
+    def add(self, us):
+        if not self.count:
+            self.mean_us = us
+            self.min_us = us
+            self.max_us = us
+        else:
+            self.mean_us += (us - self.mean_us) // 8
+            self.jitter_us += (abs(us - self.mean_us) - self.jitter_us) // 8
+            if us < self.min_us:
+                self.min_us = us
+            if us > self.max_us:
+                self.max_us = us
+        self.count += 1
+
+
+class LatencyModel:
+    __slots__ = ('floor_us', 'stats', '_win', '_n', '_i',
+                 '_base_us', '_base_ms', '_last_ms')
+
+    def __init__(self, floor_us=DEFAULT_FLOOR_US):
+        self.floor_us = floor_us
+        # Estimated delay of each epoch after its true second
+        self.stats = LatencyStats()
+        # Arrival offsets (us) relative to the base arrival / epoch time
+        self._win = array('i', [0] * _WINDOW)
+        self._n = 0
+        self._i = 0
+        self._base_us = 0
+        self._base_ms = 0
+        self._last_ms = 0
+
+    def _offset(self, arrival_us, ms):
+        d = (ms - self._base_ms) % _DAY_MS
+        if d > _DAY_MS // 2:
+            d -= _DAY_MS
+        return time.ticks_diff(arrival_us, self._base_us) - d * 1000
+
+    def add(self, arrival_us, ms):
+        """Record an epoch at `ms` milliseconds of the UTC day whose first byte arrived at ticks_us()
+        value arrival_us. Returns the estimated ticks_us() at which its second started."""
+        now = time.ticks_ms()
+        if self._n and time.ticks_diff(now, self._last_ms) > _RESET_MS:
+            self._n = 0
+        self._last_ms = now
+        win = self._win
+        if self._n:
+            o = self._offset(arrival_us, ms)
+            if abs(o) > _MAX_OFFSET_US:
+                self._n = 0
+            elif abs(time.ticks_diff(arrival_us, self._base_us)) > _REBASE_US:
+                for k in range(self._n):
+                    win[k] -= o
+                self._base_us = arrival_us
+                self._base_ms = ms
+        if not self._n:
+            self._base_us = arrival_us
+            self._base_ms = ms
+            self._i = 0
+
+        o = self._offset(arrival_us, ms)
+        win[self._i] = o
+        self._i = (self._i + 1) % _WINDOW
+        if self._n < _WINDOW:
+            self._n += 1
+
+        low = o
+        for k in range(self._n):
+            if win[k] < low:
+                low = win[k]
+        delay = o - low + self.floor_us
+        self.stats.add(delay)
+        return time.ticks_add(arrival_us, -delay)
@@ -4,9 +4,52 @@ import time
 import sys
 import gc
 
-# Display update throttle (ms)
+# Render when the clock's displayed second starts and when data changes,
+# instead of polling the display every _DISPLAY_INTERVAL_MS
+_RENDER_ON_SECOND = True
+
+# Display update throttle (ms) when not rendering on the second
 _DISPLAY_INTERVAL_MS = 200
 
+# Main loop period (ms): UART drain and buttons
+_LOOP_MS = 10
+
+# Render the next second's time digits into RAM while idle, so the boundary
+# update is a buffer blit (render-on-second mode only)
+_PRERENDER_TIME = True
+
+# RAM budget (bytes) for pre-coloured big-font glyphs drawn with blit_buffer; 0 = tft.write
+_GLYPH_CACHE_BYTES = 20480
+
+# Draw each frame into a RAM copy of the screen and send the coalesced dirty
+# rectangles with blit_buffer (about 120 KB of RAM)
+_DISPLAY_COMPOSITE = False
+
+# Slow work (DHT read, gc, pre-rendering) is skipped this close to the next second (us)
+_BOUNDARY_QUIET_US = 50000
+
+# Wake this far past the computed second boundary (us)
+_BOUNDARY_LATE_US = 200
+
+# Receive GPS bytes from the UART RX interrupt into a ring buffer instead of polling
+_GPS_IRQ_RX = False
+
+# Receiver setup at boot (u-blox UBX): port baud rate and navigation rate (1-10 Hz)
+_GPS_CONFIGURE = True
+_GPS_BAUDRATE = 115200
+_GPS_RATE_HZ = 1
+
+# Parse UBX NAV-PVT/NAV-SAT instead of NMEA (needs _GPS_CONFIGURE to enable them)
+# The USB passthrough then carries binary UBX rather than NMEA
+_GPS_UBX = False
+
+# Start in this zone by name (e.g. "Newfoundland", "India", "Nepal", which the
+# button does not cycle through) instead of detecting it from GPS; None = detect
+_TIMEZONE = None
+
+# GPIO wired to the receiver's PPS output, or None (the BN-220 has no PPS pin broken out)
+_GPS_PPS_PIN = None
+
 
 def main():
     # --- Init display ---
@@ -17,11 +60,16 @@ def main():
 
     # --- Init GPS ---
     from gps_reader import GPSReader
-    gps = GPSReader()
+    gps = GPSReader(irq_rx=_GPS_IRQ_RX, ubx=_GPS_UBX, pps_pin=_GPS_PPS_PIN)
+    if _GPS_CONFIGURE:
+        from receiver_config import configure
+        configure(gps, baudrate=_GPS_BAUDRATE, rate_hz=_GPS_RATE_HZ, ubx=_GPS_UBX)
 
     # --- Init timezone ---
     from timezone import TimezoneManager
     tz = TimezoneManager()
+    if _TIMEZONE is not None:
+        tz.set_zone(_TIMEZONE)
 
     # --- Init brightness ---
     from brightness import BrightnessController
@@ -33,7 +81,8 @@ def main():
 
     # --- Init display manager ---
     from display_manager import DisplayManager
-    dm = DisplayManager(tft)
+    dm = DisplayManager(tft, glyph_cache_bytes=_GLYPH_CACHE_BYTES,
+                        composite=_DISPLAY_COMPOSITE)
     dm.init_screen()
 
     # --- Main loop ---
@@ -51,8 +100,11 @@ def main():
                 dm.update(gps, tz, dht)
             auto_tz_done = True
 
-        # Read DHT22 sensor (self-throttled to 2s intervals)
-        dht.update()
+        # Read DHT22 sensor (self-throttled to 2s intervals); its blocking read is
+        # kept away from the second boundary when rendering on the second
+        to_next = gps.clock.us_to_next_second() if _RENDER_ON_SECOND else -1
+        quiet = to_next < 0 or to_next > _BOUNDARY_QUIET_US
+        dht_changed = dht.update() if quiet else False
 
         # Check buttons every iteration for responsive feel
         bl.check_button()
@@ -67,6 +119,23 @@ def main():
             dm.update(gps, tz, dht)
             last_display = time.ticks_ms()
 
+        if _RENDER_ON_SECOND:
+            # Redraw only when GPS/clock fields are dirty or the sensor changed;
+            # the second tick sets the time bits right at the boundary
+            if gps.dirty or dht_changed:
+                dm.update(gps, tz, dht)
+                if quiet:
+                    gc.collect()
+            if _PRERENDER_TIME and quiet:
+                dm.prerender(gps, tz)
+            # Sleep to the next second boundary if it comes before the next poll
+            to_next = gps.clock.us_to_next_second()
+            if 0 <= to_next < _LOOP_MS * 1000:
+                time.sleep_us(to_next + _BOUNDARY_LATE_US)
+            else:
+                time.sleep_ms(_LOOP_MS)
+            continue
+
         # Throttled display update
         now = time.ticks_ms()
         if time.ticks_diff(now, last_display) >= _DISPLAY_INTERVAL_MS:
@@ -77,7 +146,7 @@ def main():
                 gc_counter = 0
                 gc.collect()
 
-        time.sleep_ms(10)
+        time.sleep_ms(_LOOP_MS)
 
 
 try:
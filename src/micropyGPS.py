@@ -6,53 +6,154 @@
 # Stripped down for GPS clock: removed unused parsers (VTG, GLL),
 # helpers, logging, and features not needed by the application.
 # Optimized: update() accepts raw bytes, uses bytearray buffer.
+# Fixed-width fields are decoded with integer arithmetic (nmea_decode):
+# timestamp seconds are hundredths, lat/lon minutes are ten-thousandths.
+# Parsed values live in preallocated array('i') buffers updated in place;
+# hemispheres are stored as their ASCII byte (N=78, S=83, E=69, W=87).
+# feed_bytes() scans whole UART chunks with find() instead of per-byte calls.
+# Sentences dispatch on the formatter (RMC, GGA, ...) from any talker; types
+# cleared in sentence_mask are dropped as soon as their header arrives.
+# Sentences are grouped into epochs by UTC timestamp; readers use the last
+# complete epoch from `snapshot`, never the half-updated working state.
 """
 
+from array import array
+from nmea_decode import uint, hms, dmy, coord
+
+
+def _hex_digit(c):
+    """Return the value of an ASCII hex digit byte, or -1 if it is not one."""
+    if 48 <= c <= 57:
+        return c - 48
+    c |= 0x20
+    if 97 <= c <= 102:
+        return c - 87
+    return -1
+
+
+# Sentence formatter codes: the three formatter characters packed into an int
+RMC = 0x524D43
+GGA = 0x474741
+GSA = 0x475341
+GSV = 0x475356
+
+# Sentence mask bits (MicropyGPS.sentence_mask), independent of talker ID
+MASK_RMC = 0x01
+MASK_GGA = 0x02
+MASK_GSA = 0x04
+MASK_GSV = 0x08
+MASK_ALL = MASK_RMC | MASK_GGA | MASK_GSA | MASK_GSV
+
+# Talker ID packed into an int -> slot in the per-constellation satellites-in-view table
+_GSV_SLOTS = {0x4750: 0,   # GP  GPS
+              0x474C: 1,   # GL  GLONASS
+              0x4741: 2,   # GA  Galileo
+              0x4742: 3,   # GB  BeiDou
+              0x4244: 3,   # BD  BeiDou (legacy)
+              0x4751: 4,   # GQ  QZSS
+              0x4749: 5,   # GI  NavIC
+              }
+_GSV_OTHER = 6
+
+# Published snapshot layout (MicropyGPS.snapshot, an array('i') of SNAP_SIZE)
+SNAP_HOUR = 0
+SNAP_MINUTE = 1
+SNAP_HUNDREDTHS = 2
+SNAP_DAY = 3
+SNAP_MONTH = 4
+SNAP_YEAR = 5          # 2-digit year
+SNAP_LAT_DEG = 6
+SNAP_LAT_MIN = 7       # ten-thousandths of a minute
+SNAP_LAT_HEMI = 8      # hemisphere byte
+SNAP_LON_DEG = 9
+SNAP_LON_MIN = 10
+SNAP_LON_HEMI = 11
+SNAP_VALID = 12
+SNAP_FIX_TYPE = 13
+SNAP_SIU = 14
+SNAP_SIV = 15
+SNAP_TIME_VALID = 16   # receiver time and date are plausible, with or without a fix
+SNAP_SIZE = 17
+
+# Plausible 2-digit years; others are receiver defaults before UTC is known
+# (e.g. the 1980 GPS epoch), not real dates
+_MIN_YEAR = 25
+_MAX_YEAR = 79
+
 
 class MicropyGPS(object):
     """GPS NMEA Sentence Parser. Creates object that stores all relevant GPS data and statistics.
-    Parses sentences one character at a time using update(). """
+    Parses whole chunks with feed_bytes(), or one character at a time using update(). """
 
     # Max Number of Characters a valid sentence can be (based on GGA sentence)
     SENTENCE_LIMIT = 90
-    __HEMISPHERES = ('N', 'S', 'E', 'W')
+    # Max Number of comma-separated fields tracked per sentence (based on GSV sentence)
+    SEGMENT_LIMIT = 24
+    # Hemisphere bytes: N, S, E, W
+    __HEMISPHERES = (78, 83, 69, 87)
 
-    __slots__ = ('sentence_active', 'process_crc', 'gps_segments', 'crc_xor',
+    __slots__ = ('sentence_active', 'process_crc', 'crc_xor',
                  'char_count', 'crc_fails', 'clean_sentences', 'parsed_sentences',
                  'timestamp', 'date', '_latitude', '_longitude',
-                 'satellites_in_view', 'satellites_in_use', 'valid', 'fix_type',
-                 '_buf', '_buf_len', '_crc_buf', '_crc_len')
+                 'satellites_in_view', 'satellites_in_use', 'valid', 'time_valid', 'fix_type',
+                 '_buf', '_buf_len', '_crc_buf', '_crc_len', '_seg', '_seg_count', '_tmp',
+                 'sentence_mask', 'filtered_sentences', '_siv',
+                 'epoch', '_snaps', '_front', '_epoch_time', '_epoch_dirty',
+                 'mark', '_open_mark', 'epoch_mark')
 
-    def __init__(self):
+    def __init__(self, sentence_mask=MASK_ALL):
         #####################
         # Object Status Flags
         self.sentence_active = False
         self.process_crc = False
-        self.gps_segments = []
         self.crc_xor = 0
         self.char_count = 0
+        # Sentence types to parse; anything else is dropped once its header arrives
+        self.sentence_mask = sentence_mask
 
         #####################
         # Sentence Statistics
         self.crc_fails = 0
         self.clean_sentences = 0
         self.parsed_sentences = 0
+        self.filtered_sentences = 0
 
         #####################
         # Data From Sentences
-        # Time
-        self.timestamp = [0, 0, 0.0]
-        self.date = [0, 0, 0]
+        # Time: [hours, minutes, hundredths of a second], date: [day, month, 2-digit year]
+        self.timestamp = array('i', (0, 0, 0))
+        self.date = array('i', (0, 0, 0))
 
-        # Position
-        self._latitude = [0, 0.0, 'N']
-        self._longitude = [0, 0.0, 'W']
+        # Position: [degrees, minutes in ten-thousandths, hemisphere byte]
+        self._latitude = array('i', (0, 0, 78))
+        self._longitude = array('i', (0, 0, 87))
 
         # GPS Info
         self.satellites_in_view = 0
         self.satellites_in_use = 0
         self.valid = False
+        # RMC time and date look real; set well before a position fix on a cold start
+        self.time_valid = False
         self.fix_type = 1
+        # Satellites in view per constellation (GSV talker), summed into satellites_in_view
+        self._siv = bytearray(_GSV_OTHER + 1)
+
+        #####################
+        # Epoch snapshots: double buffer swapped by index on publish
+        self.epoch = 0
+        self._snaps = (array('i', [0] * SNAP_SIZE), array('i', [0] * SNAP_SIZE))
+        for snap in self._snaps:
+            snap[SNAP_LAT_HEMI] = 78
+            snap[SNAP_LON_HEMI] = 87
+            snap[SNAP_FIX_TYPE] = 1
+        self._front = 0
+        self._epoch_time = -1
+        self._epoch_dirty = False
+        # Caller's value (the reader's burst arrival time) when each epoch opened,
+        # published with its snapshot as epoch_mark
+        self.mark = 0
+        self._open_mark = 0
+        self.epoch_mark = 0
 
         #####################
         # Bytearray sentence buffer
@@ -60,6 +161,75 @@ class MicropyGPS(object):
         self._buf_len = 0
         self._crc_buf = bytearray(2)
         self._crc_len = 0
+        # Field start offsets into _buf (plus end sentinel)
+        self._seg = bytearray(self.SEGMENT_LIMIT + 1)
+        self._seg_count = 0
+        # Decoder output scratch
+        self._tmp = array('i', (0, 0, 0))
+
+    ########################################
+    # Field Access
+    ########################################
+    # Fields are read in place from _buf: _seg[i] is the start offset of field i and
+    # _seg[i + 1] - 1 its end, so parsing a sentence allocates no strings or lists.
+
+    def _split(self):
+        """Record the start offset of every comma-separated field in the sentence buffer"""
+        b = self._buf
+        n = self._buf_len
+        seg = self._seg
+        count = 1
+        i = b.find(b',', 0, n)
+        while i >= 0 and count < self.SEGMENT_LIMIT:
+            seg[count] = i + 1
+            count += 1
+            i = b.find(b',', i + 1, n)
+        seg[count] = n + 1
+        self._seg_count = count
+
+    def _field_char(self, i):
+        """Return the byte of a one-character field, or 0 if the field is empty or longer"""
+        s = self._seg[i]
+        if self._seg[i + 1] - 1 - s != 1:
+            return 0
+        return self._buf[s]
+
+    def _field_int(self, i):
+        """Return field i as an unsigned integer, or -1 if it is empty or not all digits"""
+        return uint(self._buf, self._seg[i], self._seg[i + 1] - 1)
+
+    def _field_time(self, i):
+        """Decode an hhmmss.ss field into _tmp[0:3]; an empty field decodes as midnight"""
+        s = self._seg[i]
+        e = self._seg[i + 1] - 1
+        if e > s:
+            return hms(self._buf, s, e, self._tmp)
+        self._tmp[0] = 0
+        self._tmp[1] = 0
+        self._tmp[2] = 0
+        return True
+
+    def _field_coord(self, i, deg_digits):
+        """Decode a ddmm.mmmm / dddmm.mmmm field into _tmp[0:2]"""
+        return coord(self._buf, self._seg[i], self._seg[i + 1] - 1, deg_digits, self._tmp)
+
+    def _open_epoch(self):
+        """Called with a sentence time decoded into _tmp[0:3]. A timestamp different from the open
+        epoch's closes that epoch (publishing its snapshot) before this sentence is applied"""
+        t = self._tmp
+        key = (t[0] * 60 + t[1]) * 6000 + t[2]
+        if key != self._epoch_time:
+            if self._epoch_dirty:
+                self.end_epoch()
+            self._epoch_time = key
+            self._open_mark = self.mark
+
+    @staticmethod
+    def _set3(a, v0, v1, v2):
+        """Overwrite a 3-element state array in place"""
+        a[0] = v0
+        a[1] = v1
+        a[2] = v2
 
     ########################################
     # Sentence Parsers
@@ -67,55 +237,43 @@ class MicropyGPS(object):
     def gprmc(self):
         """Parse Recommended Minimum Specific GPS/Transit data (RMC) Sentence.
         Updates UTC timestamp, latitude, longitude, Date, and fix status"""
+        if self._seg_count < 10:
+            return False
+        t = self._tmp
 
         # UTC Timestamp
-        try:
-            utc_string = self.gps_segments[1]
-
-            if utc_string:
-                hours = int(utc_string[0:2]) % 24
-                minutes = int(utc_string[2:4])
-                seconds = float(utc_string[4:])
-                self.timestamp = [hours, minutes, seconds]
-            else:
-                self.timestamp = [0, 0, 0.0]
-
-        except ValueError:
+        if not self._field_time(1):
             return False
+        self._open_epoch()
+        self._set3(self.timestamp, t[0], t[1], t[2])
 
         # Date stamp
-        try:
-            date_string = self.gps_segments[9]
-
-            if date_string:
-                day = int(date_string[0:2])
-                month = int(date_string[2:4])
-                year = int(date_string[4:6])
-                self.date = (day, month, year)
-            else:
-                self.date = (0, 0, 0)
+        s = self._seg[9]
+        e = self._seg[10] - 1
+        if e > s:
+            if not dmy(self._buf, s, e, self.date):
+                return False
+        else:
+            self._set3(self.date, 0, 0, 0)
 
-        except ValueError:
-            return False
+        d = self.date
+        self.time_valid = (_MIN_YEAR <= d[2] <= _MAX_YEAR and 1 <= d[1] <= 12 and 1 <= d[0] <= 31
+                           and t[1] < 60 and t[2] < 6100)
 
         # Check Receiver Data Valid Flag
-        if self.gps_segments[2] == 'A':
-
-            # Longitude / Latitude
-            try:
-                # Latitude
-                l_string = self.gps_segments[3]
-                lat_degs = int(l_string[0:2])
-                lat_mins = float(l_string[2:])
-                lat_hemi = self.gps_segments[4]
-
-                # Longitude
-                l_string = self.gps_segments[5]
-                lon_degs = int(l_string[0:3])
-                lon_mins = float(l_string[3:])
-                lon_hemi = self.gps_segments[6]
-            except ValueError:
+        if self._field_char(2) == 65:  # 'A'
+
+            # Latitude
+            if not self._field_coord(3, 2):
                 return False
+            lat_degs = t[0]
+            lat_mins = t[1]
+            lat_hemi = self._field_char(4)
+
+            # Longitude
+            if not self._field_coord(5, 3):
+                return False
+            lon_hemi = self._field_char(6)
 
             if lat_hemi not in self.__HEMISPHERES:
                 return False
@@ -124,13 +282,13 @@ class MicropyGPS(object):
                 return False
 
             # Update Object Data
-            self._latitude = [lat_degs, lat_mins, lat_hemi]
-            self._longitude = [lon_degs, lon_mins, lon_hemi]
+            self._set3(self._latitude, lat_degs, lat_mins, lat_hemi)
+            self._set3(self._longitude, t[0], t[1], lon_hemi)
             self.valid = True
 
         else:
-            self._latitude = [0, 0.0, 'N']
-            self._longitude = [0, 0.0, 'W']
+            self._set3(self._latitude, 0, 0, 78)
+            self._set3(self._longitude, 0, 0, 87)
             self.valid = False
 
         return True
@@ -138,39 +296,33 @@ class MicropyGPS(object):
     def gpgga(self):
         """Parse Global Positioning System Fix Data (GGA) Sentence. Updates UTC timestamp, latitude, longitude,
         fix status, and satellites in use"""
+        if self._seg_count < 8:
+            return False
+        t = self._tmp
 
-        try:
-            utc_string = self.gps_segments[1]
-
-            if utc_string:
-                hours = int(utc_string[0:2]) % 24
-                minutes = int(utc_string[2:4])
-                seconds = float(utc_string[4:])
-            else:
-                hours = 0
-                minutes = 0
-                seconds = 0.0
-
-            satellites_in_use = int(self.gps_segments[7])
-            fix_stat = int(self.gps_segments[6])
-
-        except (ValueError, IndexError):
+        if not self._field_time(1):
+            return False
+        self._open_epoch()
+        hours = t[0]
+        minutes = t[1]
+        hundredths = t[2]
+
+        satellites_in_use = self._field_int(7)
+        fix_stat = self._field_int(6)
+        if satellites_in_use < 0 or fix_stat < 0:
             return False
 
         if fix_stat:
 
-            try:
-                l_string = self.gps_segments[2]
-                lat_degs = int(l_string[0:2])
-                lat_mins = float(l_string[2:])
-                lat_hemi = self.gps_segments[3]
-
-                l_string = self.gps_segments[4]
-                lon_degs = int(l_string[0:3])
-                lon_mins = float(l_string[3:])
-                lon_hemi = self.gps_segments[5]
-            except ValueError:
+            if not self._field_coord(2, 2):
+                return False
+            lat_degs = t[0]
+            lat_mins = t[1]
+            lat_hemi = self._field_char(3)
+
+            if not self._field_coord(4, 3):
                 return False
+            lon_hemi = self._field_char(5)
 
             if lat_hemi not in self.__HEMISPHERES:
                 return False
@@ -178,28 +330,38 @@ class MicropyGPS(object):
             if lon_hemi not in self.__HEMISPHERES:
                 return False
 
-            self._latitude = [lat_degs, lat_mins, lat_hemi]
-            self._longitude = [lon_degs, lon_mins, lon_hemi]
+            self._set3(self._latitude, lat_degs, lat_mins, lat_hemi)
+            self._set3(self._longitude, t[0], t[1], lon_hemi)
 
-        self.timestamp = [hours, minutes, seconds]
+        self._set3(self.timestamp, hours, minutes, hundredths)
         self.satellites_in_use = satellites_in_use
 
         return True
 
     def gpgsa(self):
         """Parse GNSS DOP and Active Satellites (GSA) sentence. Updates fix type."""
-        try:
-            self.fix_type = int(self.gps_segments[2])
-        except ValueError:
+        if self._seg_count < 3:
+            return False
+        fix_type = self._field_int(2)
+        if fix_type < 0:
             return False
+        self.fix_type = fix_type
         return True
 
     def gpgsv(self):
-        """Parse Satellites in View (GSV) sentence. Updates satellites in view count."""
-        try:
-            self.satellites_in_view = int(self.gps_segments[3])
-        except (ValueError, IndexError):
+        """Parse Satellites in View (GSV) sentence. Updates the talker's satellites in view count
+        and the total across all constellations."""
+        if self._seg_count < 4:
             return False
+        count = self._field_int(3)
+        if count < 0:
+            return False
+        siv = self._siv
+        siv[_GSV_SLOTS.get(self._buf[0] << 8 | self._buf[1], _GSV_OTHER)] = min(count, 255)
+        total = 0
+        for n in siv:
+            total += n
+        self.satellites_in_view = total
         return True
 
     ##########################################
@@ -217,8 +379,8 @@ class MicropyGPS(object):
 
     def update(self, new_byte):
         """Process a new input byte and updates GPS object if necessary based on special characters ('$', ',', '*')
-        Function builds a bytearray buffer that is decoded and split into segments on valid CRC,
-        then parsed by the appropriate sentence function. Returns sentence type on successful parse, None otherwise"""
+        Function builds a bytearray buffer whose field offsets are recorded on valid CRC,
+        then parsed by the appropriate sentence function. Returns the formatter code on successful parse, None otherwise"""
 
         valid_sentence = False
 
@@ -237,47 +399,210 @@ class MicropyGPS(object):
 
                 if self.process_crc:
                     # Data byte (including commas) — accumulate and XOR
+                    if self._buf_len >= self.SENTENCE_LIMIT:
+                        self.sentence_active = False
+                        return None
                     self._buf[self._buf_len] = new_byte
                     self._buf_len += 1
                     self.crc_xor ^= new_byte
+                    if self._buf_len == 5 and not self._header_wanted():
+                        self.sentence_active = False
                 else:
                     # CRC hex digit
                     self._crc_buf[self._crc_len] = new_byte
                     self._crc_len += 1
                     if self._crc_len == 2:
-                        try:
-                            final_crc = int(self._crc_buf.decode(), 16)
-                            if self.crc_xor == final_crc:
+                        self.sentence_active = False
+                        hi = _hex_digit(self._crc_buf[0])
+                        lo = _hex_digit(self._crc_buf[1])
+                        if hi >= 0 and lo >= 0:
+                            if self.crc_xor == (hi << 4 | lo):
                                 valid_sentence = True
                             else:
                                 self.crc_fails += 1
-                        except ValueError:
-                            pass
 
                 if valid_sentence:
                     self.clean_sentences += 1
                     self.sentence_active = False
+                    return self._parse_sentence()
 
-                    # Decode buffer and split into segments
-                    self.gps_segments = self._buf[:self._buf_len].decode().split(',')
-
-                    if self.gps_segments[0] in self.supported_sentences:
-
-                        if self.supported_sentences[self.gps_segments[0]](self):
+                if self.char_count > self.SENTENCE_LIMIT:
+                    self.sentence_active = False
 
-                            self.parsed_sentences += 1
-                            return self.gps_segments[0]
+        return None
 
-                if self.char_count > self.SENTENCE_LIMIT:
+    def feed_bytes(self, buf, start=0, end=-1):
+        """Process a chunk of raw NMEA bytes in bulk. Locates '$', '*' and line ends with find() on the
+        whole chunk, copies and XORs only the payload bytes, and keeps partial-sentence state between
+        calls so a sentence may be split across chunks. Bytes outside 10..126 are skipped, as in
+        update(). Returns the number of sentences parsed"""
+        if end < 0:
+            end = len(buf)
+        parsed = 0
+        i = start
+
+        while i < end:
+            if not self.sentence_active:
+                i = buf.find(b'$', i, end)
+                if i < 0:
+                    break
+                self.new_sentence()
+                i += 1
+
+            elif self.process_crc:
+                # Payload runs up to '*'; a new '$' or a line end before it abandons the sentence
+                star = buf.find(b'*', i, end)
+                stop = end if star < 0 else star
+                k = buf.find(b'$', i, stop)
+                if k >= 0:
+                    stop = star = k
+                k = buf.find(b'\n', i, stop)
+                if k >= 0:
+                    stop = star = k
+
+                n = self._buf_len
+                if n < 5 and stop - i > 5 - n:
+                    # Take only the talker + formatter header first, so masked sentence
+                    # types are dropped before their body is buffered or XORed
+                    stop = i + 5 - n
+                    star = -1
+                if n + stop - i > self.SENTENCE_LIMIT:
                     self.sentence_active = False
+                    i = stop
+                    continue
+
+                b = self._buf
+                x = self.crc_xor
+                for k in range(i, stop):
+                    c = buf[k]
+                    if 10 <= c <= 126:
+                        b[n] = c
+                        x ^= c
+                        n += 1
+                if n == 5 and self._buf_len < 5 and not self._header_wanted():
+                    self.sentence_active = False
+                    i = stop
+                    continue
+                self._buf_len = n
+                self.crc_xor = x
+
+                if star < 0:
+                    i = stop
+                elif buf[star] == 42:  # '*'
+                    self.process_crc = False
+                    i = star + 1
+                else:
+                    # '$' is picked up by the next pass, a line end is skipped
+                    self.sentence_active = False
+                    i = star if buf[star] == 36 else star + 1
+
+            else:
+                # Two CRC hex digits, possibly split across chunks
+                crc = self._crc_buf
+                while self._crc_len < 2 and i < end:
+                    c = buf[i]
+                    i += 1
+                    if 10 <= c <= 126:
+                        crc[self._crc_len] = c
+                        self._crc_len += 1
+                if self._crc_len < 2:
+                    break
+
+                self.sentence_active = False
+                hi = _hex_digit(crc[0])
+                lo = _hex_digit(crc[1])
+                if hi < 0 or lo < 0:
+                    continue
+                if (hi << 4 | lo) != self.crc_xor:
+                    self.crc_fails += 1
+                    continue
+
+                self.clean_sentences += 1
+                if self._parse_sentence() is not None:
+                    parsed += 1
+
+        return parsed
+
+    def _parse_sentence(self):
+        """Locate the fields of the buffered payload and dispatch it to its sentence parser.
+        Returns the formatter code (e.g. RMC) on successful parse, None otherwise"""
+        b = self._buf
+        if self._buf_len < 5:
+            return None
+        formatter = b[2] << 16 | b[3] << 8 | b[4]
+        entry = self.supported_sentences.get(formatter)
+        if entry is None or not entry[0] & self.sentence_mask:
+            return None
+
+        self._split()
+        if self._seg[1] != 6:
+            return None
+        if entry[1](self):
+            self.parsed_sentences += 1
+            self._epoch_dirty = True
+            return formatter
 
         return None
 
-    # All the currently supported NMEA sentences
-    supported_sentences = {'GPRMC': gprmc, 'GLRMC': gprmc,
-                           'GPGGA': gpgga, 'GLGGA': gpgga,
-                           'GPGSA': gpgsa, 'GLGSA': gpgsa,
-                           'GPGSV': gpgsv, 'GLGSV': gpgsv,
-                           'GNGGA': gpgga, 'GNRMC': gprmc,
-                           'GNGSA': gpgsa,
+    ##########################################
+    # Epoch Snapshots
+    ##########################################
+
+    @property
+    def snapshot(self):
+        """Last published epoch as an array('i') indexed by the SNAP_* constants. The two snapshot
+        buffers alternate, so this one is overwritten by the publish after next; treat it as read-only"""
+        return self._snaps[self._front]
+
+    def end_epoch(self):
+        """Publish the working state of the open epoch as the new snapshot. Called when a sentence with
+        a new timestamp arrives, and by the reader when the UART goes idle after a burst.
+        Returns True if a snapshot was published"""
+        if not self._epoch_dirty:
+            return False
+        back = 1 - self._front
+        snap = self._snaps[back]
+        ts = self.timestamp
+        snap[SNAP_HOUR] = ts[0]
+        snap[SNAP_MINUTE] = ts[1]
+        snap[SNAP_HUNDREDTHS] = ts[2]
+        d = self.date
+        snap[SNAP_DAY] = d[0]
+        snap[SNAP_MONTH] = d[1]
+        snap[SNAP_YEAR] = d[2]
+        p = self._latitude
+        snap[SNAP_LAT_DEG] = p[0]
+        snap[SNAP_LAT_MIN] = p[1]
+        snap[SNAP_LAT_HEMI] = p[2]
+        p = self._longitude
+        snap[SNAP_LON_DEG] = p[0]
+        snap[SNAP_LON_MIN] = p[1]
+        snap[SNAP_LON_HEMI] = p[2]
+        snap[SNAP_VALID] = 1 if self.valid else 0
+        snap[SNAP_TIME_VALID] = 1 if self.time_valid else 0
+        snap[SNAP_FIX_TYPE] = self.fix_type
+        snap[SNAP_SIU] = self.satellites_in_use
+        snap[SNAP_SIV] = self.satellites_in_view
+        self._front = back
+        self._epoch_dirty = False
+        self.epoch_mark = self._open_mark
+        self.epoch += 1
+        return True
+
+    def _header_wanted(self):
+        """Check the buffered talker + formatter header against the sentence mask.
+        Counts and returns False for sentences that should be dropped unparsed"""
+        b = self._buf
+        entry = self.supported_sentences.get(b[2] << 16 | b[3] << 8 | b[4])
+        if entry is None or not entry[0] & self.sentence_mask:
+            self.filtered_sentences += 1
+            return False
+        return True
+
+    # All the currently supported NMEA sentences, from any talker (GP, GL, GA, GB, BD, GN, ...)
+    # keyed on the three formatter bytes packed into an int, e.g. RMC = 0x524D43
+    supported_sentences = {RMC: (MASK_RMC, gprmc),
+                           GGA: (MASK_GGA, gpgga),
+                           GSA: (MASK_GSA, gpgsa),
+                           GSV: (MASK_GSV, gpgsv),
                           }
@@ -0,0 +1,92 @@
+"""Fixed-width NMEA field decoders working straight on the sentence buffer.
+
+Each decoder reads buf[s:e] with integer arithmetic only (no temporary
+strings or floats) and writes its results into a caller-supplied array.
+They return False for any field the previous int()/float() slicing code
+rejected: empty parts, non-digits, or more than one decimal point.
+"""
+
+
+def uint(buf, s, e):
+    """Return buf[s:e] as an unsigned decimal integer, or -1 if empty or not all digits."""
+    if s >= e:
+        return -1
+    v = 0
+    for i in range(s, e):
+        c = buf[i] - 48
+        if c < 0 or c > 9:
+            return -1
+        v = v * 10 + c
+    return v
+
+
+def fixed(buf, s, e, places):
+    """Return buf[s:e] ('12', '12.3', '.5', '12.') scaled by 10**places, or -1.
+
+    Fraction digits beyond `places` are validated and then truncated.
+    """
+    v = 0
+    frac = -1
+    digits = 0
+    for i in range(s, e):
+        c = buf[i]
+        if c == 46 and frac < 0:  # '.'
+            frac = 0
+            continue
+        c -= 48
+        if c < 0 or c > 9:
+            return -1
+        digits += 1
+        if frac < 0:
+            v = v * 10 + c
+        elif frac < places:
+            v = v * 10 + c
+            frac += 1
+    if not digits:
+        return -1
+    if frac < 0:
+        frac = 0
+    while frac < places:
+        v *= 10
+        frac += 1
+    return v
+
+
+def hms(buf, s, e, out):
+    """Decode 'hhmmss[.ss]' into out[0]=hours (mod 24), out[1]=minutes, out[2]=hundredths of a second."""
+    h = uint(buf, s, min(s + 2, e))
+    m = uint(buf, s + 2, min(s + 4, e))
+    cs = fixed(buf, s + 4, e, 2)
+    if h < 0 or m < 0 or cs < 0:
+        return False
+    out[0] = h % 24
+    out[1] = m
+    out[2] = cs
+    return True
+
+
+def dmy(buf, s, e, out):
+    """Decode 'ddmmyy' into out[0]=day, out[1]=month, out[2]=2-digit year. Trailing characters are ignored."""
+    d = uint(buf, s, min(s + 2, e))
+    m = uint(buf, s + 2, min(s + 4, e))
+    y = uint(buf, s + 4, min(s + 6, e))
+    if d < 0 or m < 0 or y < 0:
+        return False
+    out[0] = d
+    out[1] = m
+    out[2] = y
+    return True
+
+
+def coord(buf, s, e, deg_digits, out):
+    """Decode 'ddmm.mmmm' (deg_digits=2) or 'dddmm.mmmm' (deg_digits=3).
+
+    Writes out[0]=whole degrees, out[1]=minutes in ten-thousandths.
+    """
+    d = uint(buf, s, min(s + deg_digits, e))
+    m = fixed(buf, s + deg_digits, e, 4)
+    if d < 0 or m < 0:
+        return False
+    out[0] = d
+    out[1] = m
+    return True
@@ -0,0 +1,74 @@
+"""Optional PPS (pulse-per-second) input for sub-millisecond second boundaries.
+
+A hard pin IRQ stores the ticks_us() of each rising edge and nothing else
+(no allocation). When an epoch's sentences arrive, match() pairs them
+with the edge just before the burst; that edge is the true start of the
+epoch's second, and the burst's delay after it is folded into latency
+statistics.
+"""
+
+import time
+from machine import Pin
+from latency import LatencyStats
+
+# Longest plausible delay from the pulse to its epoch's first byte (us)
+_MAX_LATENCY_US = 950000
+# Back-dated burst timestamps may land slightly before their pulse (us)
+_EARLY_US = 20000
+
+# Without a matched pulse for this long, PPS is considered lost (ms)
+_LOCK_TIMEOUT_MS = 2500
+
+
+class PPS:
+    __slots__ = ('_pin', 'last_us', 'prev_us', 'pulses', '_matched_us', '_matched_ms',
+                 'latency')
+
+    def __init__(self, pin):
+        self._pin = Pin(pin, Pin.IN)
+        # ticks_us() of the two most recent rising edges; -1 until seen
+        self.last_us = -1
+        self.prev_us = -1
+        self.pulses = 0
+        self._matched_us = -1
+        self._matched_ms = time.ticks_ms()
+        # Delay from the pulse to the first byte of its epoch's sentences
+        self.latency = LatencyStats()
+        self._pin.irq(handler=self._irq, trigger=Pin.IRQ_RISING, hard=True)
+
+    def _irq(self, pin):
+        self.prev_us = self.last_us
+        self.last_us = time.ticks_us()
+        self.pulses += 1
+
+    def _edge_before(self, t_us):
+        """The latest edge from _EARLY_US after t_us to _MAX_LATENCY_US before it, or -1."""
+        for _ in range(2):
+            pulses = self.pulses
+            last = self.last_us
+            prev = self.prev_us
+            if pulses == self.pulses:   # no pulse arrived while reading
+                break
+        for edge in (last, prev):
+            if edge >= 0:
+                d = time.ticks_diff(t_us, edge)
+                if -_EARLY_US <= d < _MAX_LATENCY_US:
+                    return edge
+        return -1
+
+    def match(self, t_us):
+        """Pair an epoch whose data started arriving at t_us with the pulse that began its second.
+        Returns the edge's ticks_us(), or -1 if there is no unused pulse in range."""
+        edge = self._edge_before(t_us)
+        if edge < 0 or edge == self._matched_us:
+            return -1
+        self._matched_us = edge
+        self._matched_ms = time.ticks_ms()
+        self.latency.add(time.ticks_diff(t_us, edge))
+        return edge
+
+    @property
+    def locked(self):
+        """True while epochs keep being matched to pulses."""
+        return (self._matched_us >= 0
+                and time.ticks_diff(time.ticks_ms(), self._matched_ms) < _LOCK_TIMEOUT_MS)
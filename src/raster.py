@@ -0,0 +1,241 @@
+"""RGB565 rasterisation of the fixed_v01 bitmap fonts into RAM buffers.
+
+tft.write() expands a 1bpp font to RGB565 while it drives the bus. Text
+rendered here ahead of time goes out later with one blit_buffer(), a plain
+memory-to-bus copy. Buffers are laid out row-major, high byte first, as the
+st7789 driver sends them to the panel.
+
+Text may be a str or ASCII bytes (e.g. from digit_fmt); bytes are looked up
+through a per-font code table without creating any str objects.
+"""
+
+import framebuf
+
+# font module -> bytearray(128): glyph index + 1 of each ASCII code, 0 if missing
+_code_maps = {}
+
+
+def swap16(c):
+    """color565() value in the byte order of a framebuf RGB565 buffer sent by blit_buffer()."""
+    return (c & 0xFF) << 8 | c >> 8
+
+
+def code_map(font):
+    """ASCII code -> glyph index + 1 table for font (0: not in the font), built once."""
+    m = _code_maps.get(font)
+    if m is None:
+        m = bytearray(128)
+        fmap = font.MAP
+        for i in range(len(fmap)):
+            c = ord(fmap[i])
+            if c < 128:
+                m[c] = i + 1
+        _code_maps[font] = m
+    return m
+
+
+def glyph_index(font, ch):
+    """Glyph index of ch (a 1-char str or an ASCII code) in font, or -1 if missing."""
+    if isinstance(ch, str):
+        return font.MAP.find(ch)
+    return code_map(font)[ch] - 1 if ch < 128 else -1
+
+
+def char_width(font, ch):
+    """Advance of ch in font; 0 for characters missing from the font (write() skips them)."""
+    i = glyph_index(font, ch)
+    return font.WIDTHS[i] if i >= 0 else 0
+
+
+def text_width(font, text):
+    """Width in pixels of text in font."""
+    w = 0
+    for ch in text:
+        w += char_width(font, ch)
+    return w
+
+
+def draw_glyph(fb, font, i, x, y, fg, bg):
+    """Draw glyph index i with its background onto an RGB565 FrameBuffer; fg and bg are
+    already swap16()ed. Returns the glyph width"""
+    h = font.HEIGHT
+    w = font.WIDTHS[i]
+    bitmaps = font.BITMAPS
+    offsets = font.OFFSETS
+    ow = font.OFFSET_WIDTH
+    bit = 0
+    for k in range(i * ow, i * ow + ow):
+        bit = bit << 8 | offsets[k]
+    fb.fill_rect(x, y, w, h, bg)
+    # Glyph bits are row-major, MSB first; set pixels are drawn as horizontal runs
+    for row in range(y, y + h):
+        run = -1
+        for col in range(w):
+            if bitmaps[bit >> 3] & (0x80 >> (bit & 7)):
+                if run < 0:
+                    run = col
+            elif run >= 0:
+                fb.hline(x + run, row, col - run, fg)
+                run = -1
+            bit += 1
+        if run >= 0:
+            fb.hline(x + run, row, w - run, fg)
+    return w
+
+
+def draw_text(fb, font, text, x, y, fg, bg, start=0):
+    """Draw text[start:] with its background onto an RGB565 FrameBuffer; fg and bg are
+    color565() values. Returns the x just past the text"""
+    fg = swap16(fg)
+    bg = swap16(bg)
+    for k in range(start, len(text)):
+        i = glyph_index(font, text[k])
+        if i >= 0:
+            x += draw_glyph(fb, font, i, x, y, fg, bg)
+    return x
+
+
+class TextBuffer:
+    """Text rendered into RAM, ready to be blitted at any position."""
+    __slots__ = ('_buf', '_views', 'font', 'width')
+
+    def __init__(self, font, max_width):
+        """Room for text up to max_width pixels wide in font."""
+        self._buf = bytearray(max_width * font.HEIGHT * 2)
+        # width -> (FrameBuffer, memoryview) over the buffer, made once per width
+        self._views = {}
+        self.font = font
+        self.width = 0
+
+    def _view(self, w):
+        v = self._views.get(w)
+        if v is None:
+            h = self.font.HEIGHT
+            v = (framebuf.FrameBuffer(self._buf, w, h, framebuf.RGB565),
+                 memoryview(self._buf)[:w * h * 2])
+            self._views[w] = v
+        return v
+
+    def render(self, text, fg, bg, start=0):
+        """Rasterise text[start:]; returns False (and keeps the old contents) if it does not fit."""
+        font = self.font
+        w = 0
+        for k in range(start, len(text)):
+            w += char_width(font, text[k])
+        if not w or w * font.HEIGHT * 2 > len(self._buf):
+            return False
+        draw_text(self._view(w)[0], font, text, 0, 0, fg, bg, start)
+        self.width = w
+        return True
+
+    def blit(self, tft, x, y):
+        """Send the rendered text to the panel at x, y in one transfer."""
+        tft.blit_buffer(self._view(self.width)[1], x, y, self.width, self.font.HEIGHT)
+
+
+class GlyphCache:
+    """Pre-coloured RGB565 glyphs of one font, each drawn with a single blit_buffer().
+
+    A glyph is expanded the first time it is drawn in a colour pair and kept while it
+    fits in the byte budget; the least recently used glyph makes room for a new one.
+    With stage_width, text up to that many pixels wide is assembled from the cached
+    glyphs in RAM and sent with one blit_buffer() instead of one per glyph.
+    """
+    __slots__ = ('font', 'budget', 'used', '_pairs', '_glyphs', '_tick', '_stage',
+                 'hits', 'misses', 'evictions')
+
+    def __init__(self, font, budget, stage_width=0):
+        self.font = font
+        self.budget = budget
+        self.used = 0
+        # (fg, bg) colour pairs seen; a glyph's key is pair index * 256 + glyph index
+        self._pairs = []
+        # key -> [RGB565 buffer, width, last use, FrameBuffer over the buffer]
+        self._glyphs = {}
+        self._tick = 0
+        self._stage = TextBuffer(font, stage_width) if stage_width else None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _pair(self, fg, bg):
+        pairs = self._pairs
+        for i in range(len(pairs)):
+            p = pairs[i]
+            if p[0] == fg and p[1] == bg:
+                return i * 256
+        pairs.append((fg, bg))
+        return (len(pairs) - 1) * 256
+
+    def _evict(self):
+        """Drop the least recently used glyph."""
+        glyphs = self._glyphs
+        oldest = -1
+        stamp = 0
+        for k in glyphs:
+            t = glyphs[k][2]
+            if oldest < 0 or t < stamp:
+                oldest = k
+                stamp = t
+        self.used -= len(glyphs.pop(oldest)[0])
+        self.evictions += 1
+
+    def _glyph(self, base, i, fg, bg):
+        self._tick += 1
+        g = self._glyphs.get(base + i)
+        if g is not None:
+            self.hits += 1
+            g[2] = self._tick
+            return g
+        font = self.font
+        w = font.WIDTHS[i]
+        size = w * font.HEIGHT * 2
+        while self._glyphs and self.used + size > self.budget:
+            self._evict()
+        buf = bytearray(size)
+        fb = framebuf.FrameBuffer(buf, w, font.HEIGHT, framebuf.RGB565)
+        draw_glyph(fb, font, i, 0, 0, swap16(fg), swap16(bg))
+        g = [buf, w, self._tick, fb]
+        self._glyphs[base + i] = g
+        self.used += size
+        self.misses += 1
+        return g
+
+    def draw_glyph(self, tft, i, x, y, fg, bg):
+        """Blit glyph index i at x, y; returns its width."""
+        g = self._glyph(self._pair(fg, bg), i, fg, bg)
+        tft.blit_buffer(g[0], x, y, g[1], self.font.HEIGHT)
+        return g[1]
+
+    def draw(self, tft, text, x, y, fg, bg, start=0, end=-1):
+        """Blit text[start:end] at x, y, in one blit_buffer() when it fits the stage and
+        glyph by glyph otherwise; returns the x just past it."""
+        if end < 0:
+            end = len(text)
+        base = self._pair(fg, bg)
+        font = self.font
+        h = font.HEIGHT
+        stage = self._stage
+        if stage is not None and end - start > 1:
+            w = 0
+            for k in range(start, end):
+                w += char_width(font, text[k])
+            if 0 < w and w * h * 2 <= len(stage._buf):
+                fb = stage._view(w)[0]
+                ox = 0
+                for k in range(start, end):
+                    i = glyph_index(font, text[k])
+                    if i >= 0:
+                        g = self._glyph(base, i, fg, bg)
+                        fb.blit(g[3], ox, 0)
+                        ox += g[1]
+                stage.width = w
+                stage.blit(tft, x, y)
+                return x + w
+        for k in range(start, end):
+            i = glyph_index(font, text[k])
+            if i >= 0:
+                g = self._glyph(base, i, fg, bg)
+                tft.blit_buffer(g[0], x, y, g[1], h)
+                x += g[1]
+        return x
@@ -0,0 +1,213 @@
+"""u-blox M8 (BN-220) receiver configuration over UBX at boot.
+
+Turns off NMEA sentences the clock does not parse (or all of them in
+favour of UBX NAV-PVT/NAV-SAT), raises the port baud rate and optionally
+the navigation rate, checking ACK-ACK / ACK-NAK for every command.
+Settings live in the receiver's RAM, so they are sent on every boot; a
+receiver left at the new baud rate by a warm MCU reset is found by
+probing.
+"""
+
+import time
+from micropyGPS import MASK_ALL, MASK_RMC, MASK_GGA, MASK_GSA, MASK_GSV
+from ubx import fletcher, CLS_NAV, ID_NAV_PVT, ID_NAV_SAT
+
+# UBX class / message IDs
+_CLS_ACK = 0x05
+_ID_ACK_NAK = 0x00
+_ID_ACK_ACK = 0x01
+_CLS_CFG = 0x06
+_ID_CFG_PRT = 0x00
+_ID_CFG_MSG = 0x01
+_ID_CFG_RATE = 0x08
+_CLS_NMEA = 0xF0
+
+# Standard NMEA message IDs (class 0xF0) -> parser mask bit (0 = never parsed)
+_NMEA_MSGS = (
+    (0x00, MASK_GGA),   # GGA
+    (0x01, 0),          # GLL
+    (0x02, MASK_GSA),   # GSA
+    (0x03, MASK_GSV),   # GSV
+    (0x04, MASK_RMC),   # RMC
+    (0x05, 0),          # VTG
+    (0x06, 0),          # GRS
+    (0x07, 0),          # GST
+    (0x08, 0),          # ZDA
+    (0x09, 0),          # GBS
+    (0x0A, 0),          # DTM
+    (0x0D, 0),          # GNS
+    (0x0F, 0),          # VLW
+)
+
+_UART_PORT = 1                # receiver port the BN-220 TX/RX pins are wired to
+_PRT_MODE_8N1 = 0x000008D0
+_PROTO_UBX_NMEA = 0x0003
+
+_ACK_TIMEOUT_MS = 500
+_BAUD_SETTLE_MS = 100
+
+# Baud rates probed to find a receiver that is already configured
+_PROBE_BAUDRATES = (9600, 115200, 38400, 57600, 19200, 230400)
+
+
+def _put_u16(buf, i, v):
+    buf[i] = v & 0xFF
+    buf[i + 1] = (v >> 8) & 0xFF
+
+
+def _put_u32(buf, i, v):
+    _put_u16(buf, i, v & 0xFFFF)
+    _put_u16(buf, i + 2, v >> 16)
+
+
+def ubx_frame(cls, msg_id, payload=b''):
+    """Build a complete UBX frame: sync, class, id, length, payload, checksum."""
+    n = len(payload)
+    frame = bytearray(8 + n)
+    frame[0] = 0xB5
+    frame[1] = 0x62
+    frame[2] = cls
+    frame[3] = msg_id
+    _put_u16(frame, 4, n)
+    frame[6:6 + n] = payload
+    ck = fletcher(frame, 2, 6 + n)
+    frame[6 + n] = ck >> 8
+    frame[7 + n] = ck & 0xFF
+    return frame
+
+
+class ReceiverConfig:
+    __slots__ = ('_uart', '_win')
+
+    def __init__(self, uart):
+        self._uart = uart
+        # Sliding window over received bytes, sized for an ACK frame
+        self._win = bytearray(10)
+
+    def send(self, cls, msg_id, payload=b''):
+        self._uart.write(ubx_frame(cls, msg_id, payload))
+
+    def wait_ack(self, cls, msg_id, timeout_ms=_ACK_TIMEOUT_MS):
+        """Scan incoming bytes (NMEA is skipped) for the ACK of cls/msg_id.
+
+        Returns True on ACK-ACK, False on ACK-NAK, None on timeout.
+        """
+        uart = self._uart
+        w = self._win
+        start = time.ticks_ms()
+        while time.ticks_diff(time.ticks_ms(), start) < timeout_ms:
+            if not uart.any():
+                time.sleep_ms(1)
+                continue
+            b = uart.read(1)
+            if not b:
+                continue
+            w[0:9] = w[1:10]
+            w[9] = b[0]
+            if (w[0] == 0xB5 and w[1] == 0x62 and w[2] == _CLS_ACK and w[4] == 2 and w[5] == 0
+                    and w[6] == cls and w[7] == msg_id and w[3] in (_ID_ACK_NAK, _ID_ACK_ACK)
+                    and fletcher(w, 2, 8) == (w[8] << 8 | w[9])):
+                return w[3] == _ID_ACK_ACK
+        return None
+
+    def command(self, cls, msg_id, payload=b''):
+        """Send a command and wait for its acknowledgement. Returns True only on ACK-ACK."""
+        self.send(cls, msg_id, payload)
+        return self.wait_ack(cls, msg_id) is True
+
+    def probe(self):
+        """Poll CFG-RATE; an ACK proves the receiver hears us at the current baud rate."""
+        return self.command(_CLS_CFG, _ID_CFG_RATE)
+
+    def set_message_rate(self, cls, msg_id, rate):
+        """CFG-MSG: output cls/msg_id every `rate` navigation solutions (0 = off).
+
+        The 3-byte form sets the rate only on the port the command arrives on, the UART
+        this board is wired to.
+        """
+        return self.command(_CLS_CFG, _ID_CFG_MSG, bytes((cls, msg_id, rate)))
+
+    def set_nmea_sentences(self, sentence_mask=MASK_ALL):
+        """Enable the NMEA sentences in sentence_mask and disable every other standard sentence."""
+        ok = True
+        for msg_id, bit in _NMEA_MSGS:
+            if not self.set_message_rate(_CLS_NMEA, msg_id, 1 if bit & sentence_mask else 0):
+                ok = False
+        return ok
+
+    def set_rate(self, rate_hz):
+        """CFG-RATE: navigation solution rate in Hz (1-10 on the M8), aligned to GPS time."""
+        payload = bytearray(6)
+        _put_u16(payload, 0, 1000 // rate_hz)   # measRate (ms)
+        _put_u16(payload, 2, 1)                 # navRate (cycles)
+        _put_u16(payload, 4, 1)                 # timeRef: GPS
+        return self.command(_CLS_CFG, _ID_CFG_RATE, payload)
+
+    def send_baudrate(self, baudrate):
+        """CFG-PRT: switch the receiver's UART to baudrate, 8N1, UBX+NMEA in and out.
+
+        The receiver changes speed right after this command, so its ACK is
+        usually garbled; confirm with probe() at the new rate instead.
+        """
+        payload = bytearray(20)
+        payload[0] = _UART_PORT
+        _put_u32(payload, 4, _PRT_MODE_8N1)
+        _put_u32(payload, 8, baudrate)
+        _put_u16(payload, 12, _PROTO_UBX_NMEA)
+        _put_u16(payload, 14, _PROTO_UBX_NMEA)
+        self.send(_CLS_CFG, _ID_CFG_PRT, payload)
+        self.wait_ack(_CLS_CFG, _ID_CFG_PRT, _BAUD_SETTLE_MS)
+
+    def set_ubx_nav(self, enable=True):
+        """Enable (or disable) NAV-PVT and NAV-SAT output once per navigation solution."""
+        rate = 1 if enable else 0
+        ok = self.set_message_rate(CLS_NAV, ID_NAV_PVT, rate)
+        if not self.set_message_rate(CLS_NAV, ID_NAV_SAT, rate):
+            ok = False
+        return ok
+
+
+def configure(gps, baudrate=115200, rate_hz=1, sentence_mask=MASK_ALL, ubx=False):
+    """Configure the receiver behind GPSReader `gps` and reopen its UART to match.
+
+    Finds the receiver's current baud rate, selects the output (the NMEA
+    sentences in sentence_mask, or UBX NAV-PVT/NAV-SAT with all NMEA off
+    when `ubx` is set), switches to `baudrate` and sets the navigation rate.
+    Returns True if every step was acknowledged; on failure the receiver
+    and UART are left at whatever rate they agree on.
+    """
+    # In IRQ receive mode the handler would drain the ACKs into the ring first
+    gps.pause_rx()
+    try:
+        return _configure(gps, ReceiverConfig(gps.uart), baudrate, rate_hz, sentence_mask, ubx)
+    finally:
+        gps.resume_rx()
+
+
+def _configure(gps, cfg, baudrate, rate_hz, sentence_mask, ubx):
+    current = None
+    for b in _PROBE_BAUDRATES:
+        gps.set_baudrate(b)
+        if cfg.probe():
+            current = b
+            break
+    if current is None:
+        gps.set_baudrate(_PROBE_BAUDRATES[0])
+        return False
+
+    # Fewer sentences first, so the old baud rate is not saturated meanwhile
+    ok = cfg.set_nmea_sentences(0 if ubx else sentence_mask)
+    if not cfg.set_ubx_nav(ubx):
+        ok = False
+
+    if baudrate != current:
+        cfg.send_baudrate(baudrate)
+        gps.set_baudrate(baudrate)
+        time.sleep_ms(_BAUD_SETTLE_MS)
+        if not cfg.probe():
+            gps.set_baudrate(current)
+            return False
+
+    if not cfg.set_rate(rate_hz):
+        ok = False
+    return ok
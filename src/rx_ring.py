@@ -0,0 +1,87 @@
+"""Lock-free UART receive ring buffer filled from the UART RX interrupt.
+
+Single producer (the IRQ handler advances head) and single consumer (the
+main loop advances tail), so no locking is needed: each side only writes
+its own index. One slot is always left empty to tell full from empty.
+
+On the ESP32 port UART IRQ handlers are scheduled (soft) callbacks, so the
+handler may slice memoryviews; it still never blocks or formats anything.
+"""
+
+import time
+from machine import UART
+
+# Bytes discarded per read when the ring is full
+_DISCARD_CHUNK = 64
+
+
+class RxRing:
+    __slots__ = ('buf', 'mv', '_size', '_mask', '_head', 'tail', '_discard',
+                 'last_rx', 'burst_us', 'burst_bytes', '_burst_gap_ms', 'overflows', 'dropped')
+
+    def __init__(self, uart, size=2048, burst_gap_ms=40):
+        """Attach to `uart`; `size` must be a power of two. A receive after at least
+        `burst_gap_ms` of silence starts a new burst: it is timestamped in `burst_us`, with
+        `burst_bytes` already waiting in the driver (received before the interrupt ran)."""
+        self.buf = bytearray(size)
+        self.mv = memoryview(self.buf)
+        self._size = size
+        self._mask = size - 1
+        self._head = 0
+        self.tail = 0
+        self._discard = bytearray(_DISCARD_CHUNK)
+        self.last_rx = time.ticks_ms()
+        self.burst_us = time.ticks_us()
+        self.burst_bytes = 0
+        self._burst_gap_ms = burst_gap_ms
+        # Overflow events (IRQs that found the ring full) and bytes thrown away
+        self.overflows = 0
+        self.dropped = 0
+        self.attach(uart)
+
+    def attach(self, uart):
+        """(Re)install the RX handler, e.g. after the UART was re-initialised."""
+        trigger = getattr(UART, 'IRQ_RXIDLE', 0) or UART.IRQ_RX
+        uart.irq(handler=self._irq, trigger=trigger)
+
+    def _irq(self, uart):
+        """Move everything the UART driver holds into the ring."""
+        if time.ticks_diff(time.ticks_ms(), self.last_rx) >= self._burst_gap_ms:
+            self.burst_us = time.ticks_us()
+            self.burst_bytes = uart.any()
+        head = self._head
+        overflowed = False
+        while True:
+            n = uart.any()
+            if not n:
+                break
+            free = (self.tail - head - 1) & self._mask
+            if not free:
+                # Ring full: drain the driver anyway so it keeps receiving, and count the loss
+                got = uart.readinto(self._discard, min(n, _DISCARD_CHUNK))
+                if not got:
+                    break
+                self.dropped += got
+                overflowed = True
+                continue
+            span = min(n, free, self._size - head)
+            got = uart.readinto(self.mv[head:head + span], span)
+            if not got:
+                break
+            head = (head + got) & self._mask
+            self._head = head
+        if overflowed:
+            self.overflows += 1
+        self.last_rx = time.ticks_ms()
+
+    def readable(self):
+        """Return the end of the contiguous run of unread bytes starting at `tail`.
+
+        Equal to `tail` when the ring is empty; a wrapped run needs two passes.
+        """
+        head = self._head
+        return head if head >= self.tail else self._size
+
+    def advance(self, end):
+        """Mark buf[tail:end] as consumed."""
+        self.tail = end & self._mask
@@ -0,0 +1,60 @@
+"""Integer time core: instants as seconds since 2000-01-01 00:00 UTC.
+
+Dates are day numbers (days since 2000-01-01), converted to and from the
+civil calendar with Howard Hinnant's days_from_civil / civil_from_days:
+a few integer divisions, no month tables, loops or leap-year branches.
+Timezone offsets are whole minutes, so half-hour and 45-minute zones are
+handled like any other.
+
+An instant is a small int until 2034; hot paths carry it split into a day
+number and a second of day, neither of which ever grows.
+"""
+
+DAY_S = 86400
+
+# 2000-01-01 counted from 0000-03-01, the origin of the era arithmetic
+_DAY0 = 730425
+
+
+def days_from_civil(y, m, d):
+    """Day number of year y, month m (1-12), day d (1-31)."""
+    if m <= 2:
+        y -= 1
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * (m - 3 if m > 2 else m + 9) + 2) // 5 + d - 1
+    return era * 146097 + yoe * 365 + yoe // 4 - yoe // 100 + doy - _DAY0
+
+
+def civil_from_days(z, out):
+    """Write year, month, day of day number z into out[0:3] (no allocation)."""
+    z += _DAY0
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    m = mp + 3 if mp < 10 else mp - 9
+    out[0] = yoe + era * 400 + (1 if m <= 2 else 0)
+    out[1] = m
+    out[2] = doy - (153 * mp + 2) // 5 + 1
+
+
+def weekday(z):
+    """Day of week of day number z (0 = Sunday); 2000-01-01 was a Saturday."""
+    return (z + 6) % 7
+
+
+def instant(days, sod):
+    """Seconds since 2000 of second sod (0-86399) of day number days."""
+    return days * DAY_S + sod
+
+
+def local_day(days, sod, offset_min):
+    """Local day number at UTC day days, second sod, for an offset in minutes."""
+    return days + (sod + offset_min * 60) // DAY_S
+
+
+def local_sod(sod, offset_min):
+    """Local second of day at UTC second of day sod, for an offset in minutes."""
+    return (sod + offset_min * 60) % DAY_S
@@ -1,69 +1,47 @@
-"""US timezone definitions with DST support and button cycling on GPIO14."""
+"""Timezone definitions with US DST rules and button cycling on GPIO14."""
 
 from machine import Pin
 import time
+from time_core import DAY_S, days_from_civil, weekday, civil_from_days
+from array import array
 
-# US timezone table: (name, std_abbr, std_offset, dst_abbr, dst_offset, observes_dst)
+# Timezone table: (name, std_abbr, std_offset, dst_abbr, dst_offset, observes_dst),
+# offsets in minutes. The US zones come first, in tz_grid.lookup() index order,
+# and are the ones the button cycles through; the rest are chosen by name with
+# set_zone(). Zones that observe DST follow the US rules (as Newfoundland does)
 _ZONES = (
-    ("US Eastern",  "EST", -5, "EDT", -4, True),
-    ("US Central",  "CST", -6, "CDT", -5, True),
-    ("US Mountain", "MST", -7, "MDT", -6, True),
-    ("Arizona",     "MST", -7, "MST", -7, False),
-    ("US Pacific",  "PST", -8, "PDT", -7, True),
-    ("Alaska",      "AKST", -9, "AKDT", -8, True),
-    ("Hawaii",      "HST", -10, "HST", -10, False),
+    ("US Eastern",  "EST", -300, "EDT", -240, True),
+    ("US Central",  "CST", -360, "CDT", -300, True),
+    ("US Mountain", "MST", -420, "MDT", -360, True),
+    ("Arizona",     "MST", -420, "MST", -420, False),
+    ("US Pacific",  "PST", -480, "PDT", -420, True),
+    ("Alaska",      "AKST", -540, "AKDT", -480, True),
+    ("Hawaii",      "HST", -600, "HST", -600, False),
+    ("Newfoundland", "NST", -210, "NDT", -150, True),
+    ("India",       "IST", 330, "IST", 330, False),
+    ("Nepal",       "NPT", 345, "NPT", 345, False),
 )
+_BUTTON_ZONES = 7
 
 _DEBOUNCE_MS = 250
 _LONG_PRESS_MS = 1000
 
 
-def _day_of_week(year, month, day):
-    """Return day of week (0=Sunday, 1=Monday, ..., 6=Saturday).
-
-    Uses Tomohiko Sakamoto's algorithm.
-    """
-    t = (0, 3, 2, 5, 0, 3, 5, 1, 4, 6, 2, 4)
-    if month < 3:
-        year -= 1
-    return (year + year // 4 - year // 100 + year // 400 + t[month - 1] + day) % 7
-
-
 def _nth_sunday(year, month, n):
-    """Return the day-of-month of the nth Sunday in the given month."""
-    # Find first Sunday
-    dow = _day_of_week(year, month, 1)  # day of week for the 1st
-    first_sunday = 1 + (7 - dow) % 7
-    return first_sunday + 7 * (n - 1)
-
-
-def _is_dst(utc_year, utc_month, utc_day, utc_hour, std_offset):
-    """Determine if DST is active for the given UTC time and standard offset.
+    """Day number of the nth Sunday in the given month."""
+    first = days_from_civil(year, month, 1)
+    return first + (7 - weekday(first)) % 7 + 7 * (n - 1)
 
-    US DST: starts 2nd Sunday of March at 2:00 AM local (= 2-std_offset UTC),
-            ends 1st Sunday of November at 2:00 AM local (= 2-dst_offset UTC).
-    """
-    dst_start_day = _nth_sunday(utc_year, 3, 2)   # 2nd Sunday in March
-    dst_end_day = _nth_sunday(utc_year, 11, 1)     # 1st Sunday in November
 
-    # Transition times in UTC hours
-    # Spring forward: 2:00 AM standard time = (2 - std_offset) UTC
-    spring_utc_hour = 2 - std_offset
-    # Fall back: 2:00 AM daylight time = (2 - (std_offset + 1)) UTC
-    fall_utc_hour = 2 - (std_offset + 1)
-
-    # Encode as comparable value: month * 100000 + day * 1000 + hour
-    now = utc_month * 100000 + utc_day * 1000 + utc_hour
-    start = 3 * 100000 + dst_start_day * 1000 + spring_utc_hour
-    end = 11 * 100000 + dst_end_day * 1000 + fall_utc_hour
-
-    return start <= now < end
+def _transition(day, offset):
+    """Instant of 2:00 local time, at the given offset in minutes, on day number day."""
+    return day * DAY_S + 7200 - offset * 60
 
 
 class TimezoneManager:
     __slots__ = ('_index', '_button', '_last_release', '_dst_active',
                  '_manually_set', '_auto_detected', '_button_down', '_press_start',
-                 '_last_dst_hour', '_last_dst_day')
+                 '_dst_from', '_dst_until', '_ymd')
 
     def __init__(self, button_pin=14):
         self._index = 0
@@ -74,8 +52,10 @@ class TimezoneManager:
         self._auto_detected = False
         self._button_down = False
         self._press_start = 0
-        self._last_dst_hour = -1
-        self._last_dst_day = -1
+        # Instants between which _dst_active holds; an empty range forces a recompute
+        self._dst_from = 0
+        self._dst_until = 0
+        self._ymd = array('i', (0, 0, 0))
 
     def check_button(self):
         """Poll button; returns 0 (no action), 1 (short press), or 2 (long press)."""
@@ -93,15 +73,30 @@ class TimezoneManager:
             self._last_release = now
             duration = time.ticks_diff(now, self._press_start)
             if duration >= _LONG_PRESS_MS:
-                self._last_dst_hour = -1
+                self._dst_until = 0
                 return 2
-            self._index = (self._index + 1) % len(_ZONES)
+            # Cycle the US zones; from a zone outside them, start over at the first
+            self._index = self._index + 1 if self._index + 1 < _BUTTON_ZONES else 0
             self._manually_set = True
-            self._last_dst_hour = -1
+            self._dst_until = 0
             return 1
 
         return 0
 
+    def set_zone(self, name):
+        """Select a zone by name, including those outside the button cycle.
+
+        Counts as a manual choice, so auto-detection leaves it alone.
+        Returns False if there is no zone of that name.
+        """
+        for i, zone in enumerate(_ZONES):
+            if zone[0] == name:
+                self._index = i
+                self._manually_set = True
+                self._dst_until = 0
+                return True
+        return False
+
     def set_from_location(self, lat, lon, force=False):
         """Auto-detect timezone from GPS coordinates.
 
@@ -116,26 +111,50 @@ class TimezoneManager:
             if 0 <= idx < len(_ZONES):
                 self._index = idx
                 self._auto_detected = True
-                self._last_dst_hour = -1
+                self._dst_until = 0
                 return True
         except Exception:
             pass
         return False
 
-    def update_dst(self, utc_year, utc_month, utc_day, utc_hour):
-        """Update DST state based on current UTC time. Cached until hour/day changes."""
-        if utc_hour == self._last_dst_hour and utc_day == self._last_dst_day:
+    def update_dst(self, t):
+        """Update DST state for instant t (seconds since 2000, see time_core).
+
+        US DST starts the 2nd Sunday of March at 2:00 standard time and ends the 1st Sunday
+        of November at 2:00 daylight time. The state is cached for the stretch of the year
+        between transitions that contains t.
+        """
+        if self._dst_from <= t < self._dst_until:
             return
-        self._last_dst_hour = utc_hour
-        self._last_dst_day = utc_day
+        day = t // DAY_S
+        ymd = self._ymd
+        civil_from_days(day, ymd)
+        year = ymd[0]
         zone = _ZONES[self._index]
-        if zone[5]:  # observes DST
-            self._dst_active = _is_dst(utc_year, utc_month, utc_day, utc_hour, zone[2])
+        self._dst_active = False
+        self._dst_from = days_from_civil(year, 1, 1) * DAY_S
+        self._dst_until = days_from_civil(year + 1, 1, 1) * DAY_S
+        if not zone[5]:
+            return
+        start = _transition(_nth_sunday(year, 3, 2), zone[2])
+        end = _transition(_nth_sunday(year, 11, 1), zone[4])
+        if t < start:
+            self._dst_until = start
+        elif t < end:
+            self._dst_active = True
+            self._dst_from = start
+            self._dst_until = end
         else:
-            self._dst_active = False
+            self._dst_from = end
+
+    @property
+    def dst_stale(self):
+        """True after a zone change until update_dst() has run for the new zone."""
+        return self._dst_until == 0
 
     @property
     def offset(self):
+        """UTC offset in minutes."""
         zone = _ZONES[self._index]
         return zone[4] if self._dst_active else zone[2]
 
@@ -151,5 +170,8 @@ class TimezoneManager:
     @property
     def label(self):
         off = self.offset
-        sign = "+" if off >= 0 else ""
-        return "{} (UTC{}{})".format(self.name, sign, off)
+        sign = "+" if off >= 0 else "-"
+        h, m = divmod(abs(off), 60)
+        if m:
+            return "{} (UTC{}{}:{:02d})".format(self.name, sign, h, m)
+        return "{} (UTC{}{})".format(self.name, sign, h)
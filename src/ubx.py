@@ -0,0 +1,291 @@
+"""u-blox UBX binary protocol parser (NAV-PVT, NAV-SAT) for the BN-220.
+
+Drop-in alternative to MicropyGPS for GPSReader: same feed_bytes(),
+snapshot, epoch and end_epoch() interface and the same SNAP_* layout.
+One NAV-PVT carries time, date, validity, fix and position as fixed-offset
+little-endian integers, so a message is checked with the Fletcher sum
+while it is copied and then decoded with a single struct.unpack_from().
+Messages are grouped into epochs by iTOW, like NMEA sentences by time.
+"""
+
+import struct
+from array import array
+from micropyGPS import (SNAP_HOUR, SNAP_MINUTE, SNAP_HUNDREDTHS, SNAP_DAY, SNAP_MONTH,
+                        SNAP_YEAR, SNAP_LAT_DEG, SNAP_LAT_HEMI, SNAP_LON_DEG, SNAP_LON_HEMI,
+                        SNAP_VALID, SNAP_FIX_TYPE, SNAP_SIU, SNAP_SIV, SNAP_TIME_VALID,
+                        SNAP_SIZE)
+
+SYNC1 = 0xB5
+SYNC2 = 0x62
+
+CLS_NAV = 0x01
+ID_NAV_PVT = 0x07
+ID_NAV_SAT = 0x35
+
+_NAV_PVT_LEN = 92
+_NAV_SAT_HDR = 8
+# Longest payload accepted: NAV-SAT header plus 12 bytes for each of up to
+# 255 satellites (numSvs is one byte); anything longer is taken for a false sync
+_MAX_PAYLOAD = _NAV_SAT_HDR + 12 * 255
+# Payload bytes stored: all of NAV-PVT, and the NAV-SAT header (only numSvs is
+# used); the per-satellite blocks beyond this are checksummed but not kept
+_KEEP_PAYLOAD = _NAV_PVT_LEN
+
+# NAV-PVT bytes 4..31: year, month, day, hour, min, sec, valid, tAcc, nano,
+# fixType, flags, flags2, numSV, lon, lat
+_PVT_FMT = '<HBBBBBBIiBBBBii'
+_PVT_FIX_OK = 0x01          # flags: gnssFixOK
+_PVT_DATE_TIME_OK = 0x03    # valid: validDate | validTime
+
+# Parser states
+_IDLE = 0
+_SYNC = 1      # got 0xB5, expecting 0x62
+_HEADER = 2    # class, id, 2-byte length
+_PAYLOAD = 3
+_CHECKSUM = 4
+
+
+def fletcher(buf, start, end):
+    """UBX 8-bit Fletcher checksum over buf[start:end]; returns (ck_a << 8) | ck_b."""
+    a = 0
+    b = 0
+    for i in range(start, end):
+        a = (a + buf[i]) & 0xFF
+        b = (b + a) & 0xFF
+    return a << 8 | b
+
+
+def _split_coord(v, out, i, pos, neg):
+    """Store a 1e-7 degree value as degrees, ten-thousandths of a minute and hemisphere byte."""
+    if v < 0:
+        v = -v
+        out[i + 2] = neg
+    else:
+        out[i + 2] = pos
+    out[i] = v // 10000000
+    # 1e-7 degree * 60 = 6e-6 minute = 0.06 * 1e-4 minute
+    out[i + 1] = v % 10000000 * 3 // 50
+
+
+class UBXParser:
+    __slots__ = ('_buf', '_state', '_n', '_len', '_ck', '_ck_in',
+                 'clean_messages', 'crc_fails', 'parsed_messages', 'skipped_messages',
+                 '_work', '_sat_seen',
+                 'epoch', '_snaps', '_front', '_epoch_itow', '_epoch_dirty',
+                 'mark', '_open_mark', 'epoch_mark')
+
+    def __init__(self):
+        # Frame from class byte on: class, id, length (2), payload
+        self._buf = bytearray(4 + _KEEP_PAYLOAD)
+        self._state = _IDLE
+        self._n = 0
+        self._len = 0
+        self._ck = 0          # running (ck_a << 8) | ck_b
+        self._ck_in = 0       # received checksum bytes so far
+
+        # Statistics
+        self.clean_messages = 0
+        self.crc_fails = 0
+        self.parsed_messages = 0
+        self.skipped_messages = 0
+
+        # Working state of the open epoch, in snapshot layout
+        self._work = array('i', [0] * SNAP_SIZE)
+        self._work[SNAP_LAT_HEMI] = 78
+        self._work[SNAP_LON_HEMI] = 87
+        self._work[SNAP_FIX_TYPE] = 1
+        # Satellites in view come from NAV-SAT; until one arrives, in-use is shown
+        self._sat_seen = False
+
+        # Epoch snapshots: double buffer swapped by index on publish
+        self.epoch = 0
+        self._snaps = (array('i', [0] * SNAP_SIZE), array('i', [0] * SNAP_SIZE))
+        for snap in self._snaps:
+            snap[SNAP_LAT_HEMI] = 78
+            snap[SNAP_LON_HEMI] = 87
+            snap[SNAP_FIX_TYPE] = 1
+        self._front = 0
+        self._epoch_itow = -1
+        self._epoch_dirty = False
+        # Caller's value (the reader's burst arrival time) when each epoch opened,
+        # published with its snapshot as epoch_mark
+        self.mark = 0
+        self._open_mark = 0
+        self.epoch_mark = 0
+
+    def feed_bytes(self, buf, start=0, end=-1):
+        """Process a chunk of raw receiver bytes. NMEA and other traffic between frames is
+        skipped; a frame may be split across chunks. Returns the number of messages parsed"""
+        if end < 0:
+            end = len(buf)
+        parsed = 0
+        i = start
+        b = self._buf
+
+        while i < end:
+            state = self._state
+            if state == _IDLE:
+                i = buf.find(b'\xb5', i, end)
+                if i < 0:
+                    break
+                self._state = _SYNC
+                i += 1
+
+            elif state == _SYNC:
+                if buf[i] == SYNC2:
+                    self._state = _HEADER
+                    self._n = 0
+                    self._ck = 0
+                    i += 1
+                else:
+                    # Not a frame; rescan this byte, it may be the next 0xB5
+                    self._state = _IDLE
+
+            elif state == _HEADER or state == _PAYLOAD:
+                n = self._n
+                target = 4 if state == _HEADER else 4 + self._len
+                stop = min(end, i + target - n)
+                # Bytes past the end of _buf are only summed
+                keep = min(stop, max(i, i + len(b) - n))
+                ck = self._ck
+                a = ck >> 8
+                s = ck & 0xFF
+                for k in range(i, keep):
+                    c = buf[k]
+                    b[n] = c
+                    n += 1
+                    a = (a + c) & 0xFF
+                    s = (s + a) & 0xFF
+                for k in range(keep, stop):
+                    a = (a + buf[k]) & 0xFF
+                    s = (s + a) & 0xFF
+                n += stop - keep
+                self._ck = a << 8 | s
+                self._n = n
+                i = stop
+                if n < target:
+                    break
+                if state == _HEADER:
+                    self._len = b[2] | b[3] << 8
+                    if self._len > _MAX_PAYLOAD:
+                        # Too long to keep (or a false sync): resynchronise after the sync bytes
+                        self.skipped_messages += 1
+                        self._state = _IDLE
+                    else:
+                        self._state = _PAYLOAD if self._len else _CHECKSUM
+                        self._ck_in = 0
+                else:
+                    self._state = _CHECKSUM
+                    self._ck_in = 0
+
+            else:
+                # Two checksum bytes, possibly split across chunks: ck_a then ck_b
+                c = buf[i]
+                i += 1
+                if self._ck_in == 0:
+                    if c != self._ck >> 8:
+                        self.crc_fails += 1
+                        self._state = _IDLE
+                        continue
+                    self._ck_in = 1
+                    continue
+                self._state = _IDLE
+                if c != self._ck & 0xFF:
+                    self.crc_fails += 1
+                    continue
+                self.clean_messages += 1
+                if self._parse_message():
+                    parsed += 1
+
+        return parsed
+
+    def _parse_message(self):
+        """Dispatch a checked frame in _buf by class and id. Returns True if it was decoded"""
+        b = self._buf
+        if b[0] != CLS_NAV:
+            return False
+        if b[1] == ID_NAV_PVT and self._len >= _NAV_PVT_LEN:
+            self.nav_pvt()
+        elif b[1] == ID_NAV_SAT and self._len >= _NAV_SAT_HDR:
+            self.nav_sat()
+        else:
+            return False
+        self.parsed_messages += 1
+        self._epoch_dirty = True
+        return True
+
+    def _open_epoch(self):
+        """A message whose iTOW differs from the open epoch's closes that epoch first"""
+        b = self._buf
+        itow = b[4] | b[5] << 8 | b[6] << 16 | b[7] << 24
+        if itow != self._epoch_itow:
+            if self._epoch_dirty:
+                self.end_epoch()
+            self._epoch_itow = itow
+            self._open_mark = self.mark
+
+    def nav_pvt(self):
+        """Decode NAV-PVT: UTC time and date, fix type and validity, satellites used, position."""
+        self._open_epoch()
+        (year, month, day, hour, minute, sec, time_flags, _tacc, nano,
+         fix, flags, _flags2, num_sv, lon, lat) = struct.unpack_from(_PVT_FMT, self._buf, 8)
+        w = self._work
+
+        # The fields are rounded to the nearest second; nano is the signed remainder
+        cs = sec * 100 + (nano + 5000000) // 10000000
+        w[SNAP_HOUR] = hour
+        w[SNAP_MINUTE] = minute
+        w[SNAP_HUNDREDTHS] = 0 if cs < 0 else cs
+        w[SNAP_DAY] = day
+        w[SNAP_MONTH] = month
+        w[SNAP_YEAR] = year % 100
+        # Same validDate/validTime bits as NAV-TIMEUTC; usually set long before a fix
+        w[SNAP_TIME_VALID] = 1 if time_flags & _PVT_DATE_TIME_OK == _PVT_DATE_TIME_OK else 0
+
+        # fixType 2 = 2D, 3 = 3D, 4 = GNSS + dead reckoning; 0, 1 and 5 (time only) are no fix
+        if fix == 2:
+            w[SNAP_FIX_TYPE] = 2
+        elif fix == 3 or fix == 4:
+            w[SNAP_FIX_TYPE] = 3
+        else:
+            w[SNAP_FIX_TYPE] = 1
+        valid = w[SNAP_FIX_TYPE] > 1 and flags & _PVT_FIX_OK
+        w[SNAP_VALID] = 1 if valid else 0
+
+        if valid:
+            _split_coord(lat, w, SNAP_LAT_DEG, 78, 83)
+            _split_coord(lon, w, SNAP_LON_DEG, 69, 87)
+        else:
+            _split_coord(0, w, SNAP_LAT_DEG, 78, 78)
+            _split_coord(0, w, SNAP_LON_DEG, 87, 87)
+
+        w[SNAP_SIU] = num_sv
+        if not self._sat_seen:
+            w[SNAP_SIV] = num_sv
+
+    def nav_sat(self):
+        """Decode the NAV-SAT header: number of satellites in view."""
+        self._open_epoch()
+        self._work[SNAP_SIV] = self._buf[9]
+        self._sat_seen = True
+
+    @property
+    def snapshot(self):
+        """Last published epoch as an array('i') indexed by the SNAP_* constants; read-only."""
+        return self._snaps[self._front]
+
+    def end_epoch(self):
+        """Publish the open epoch's working state as the new snapshot.
+        Returns True if a snapshot was published"""
+        if not self._epoch_dirty:
+            return False
+        back = 1 - self._front
+        snap = self._snaps[back]
+        w = self._work
+        for i in range(SNAP_SIZE):
+            snap[i] = w[i]
+        self._front = back
+        self.epoch_mark = self._open_mark
+        self.epoch += 1
+        self._epoch_dirty = False
+        return True
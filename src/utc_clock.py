@@ -0,0 +1,170 @@
+"""Free-running UTC clock disciplined by GPS epochs.
+
+Each GPS epoch anchors UTC (milliseconds of day plus day number) to the
+time.ticks_us() at which the epoch's data arrived; between epochs and
+through outages the time is extrapolated from the anchor, corrected by
+the local oscillator's drift as measured against GPS. The anchor is
+rolled forward regularly so ticks_us() never wraps under it. All
+arithmetic stays within small ints (no bigints, no floats).
+"""
+
+import time
+from array import array
+from time_core import days_from_civil, civil_from_days
+
+# Broken-down current time (UTCClock.now), an array('i') indexed by:
+CLK_HOUR = 0
+CLK_MINUTE = 1
+CLK_SECOND = 2
+CLK_DAY = 3
+CLK_MONTH = 4
+CLK_YEAR = 5           # 2-digit year
+CLK_DAYS = 6           # day number (days since 2000-01-01, see time_core)
+CLK_SOD = 7            # second of day
+CLK_SIZE = 8
+
+# update() result bits
+CHANGED_TIME = 0x01    # displayed second changed
+CHANGED_DATE = 0x02    # minute or date changed (local date may roll over)
+
+_DAY_MS = 86400000
+
+# Longest extrapolation from one anchor before it is rolled forward (us);
+# well inside the ticks_us() half-period of 2**29 us
+_ROLL_US = 60000000
+
+# Drift is measured between anchors at least this far apart (ms of ticks_ms),
+# so a few ms of arrival jitter stays a few ppm
+_DRIFT_WINDOW_MS = 1200000
+# Measurements beyond this are rejected as bad anchors (1/5000 = 200 ppm)
+_DRIFT_REJECT = 5000
+
+
+class UTCClock:
+    __slots__ = ('now', '_synced', '_anchor_us', '_anchor_ms', '_day', '_ymd',
+                 '_ppm16', '_drift_known', '_ref_ticks_ms', '_ref_ms',
+                 '_last_sync_ms', '_last_sec')
+
+    def __init__(self):
+        self.now = array('i', [0] * CLK_SIZE)
+        self.now[CLK_DAYS] = -1
+        self._synced = False
+        self._anchor_us = 0
+        self._anchor_ms = 0                     # ms of day at _anchor_us
+        self._day = 0                           # anchor date as a day number
+        self._ymd = array('i', (0, 0, 0))       # civil_from_days() output
+        # Oscillator drift in 1/16 ppm; positive when the local clock runs slow
+        self._ppm16 = 0
+        self._drift_known = False
+        # Drift reference anchor (ticks_ms, ms of day)
+        self._ref_ticks_ms = 0
+        self._ref_ms = -1
+        self._last_sync_ms = 0
+        self._last_sec = -1
+
+    @property
+    def valid(self):
+        """True once the clock has been synced to GPS (it keeps running afterwards)."""
+        return self._synced
+
+    @property
+    def drift_ppm(self):
+        """Measured local oscillator drift in ppm (positive: local clock slow)."""
+        return self._ppm16 / 16
+
+    @property
+    def holdover_ms(self):
+        """Milliseconds since the last GPS sync."""
+        return time.ticks_diff(time.ticks_ms(), self._last_sync_ms)
+
+    def us_to_next_second(self):
+        """Local microseconds until the next second starts, or -1 before the first sync."""
+        if not self._synced:
+            return -1
+        e = time.ticks_diff(time.ticks_us(), self._anchor_us)
+        if e < 0:
+            e = 0
+        pos = self._anchor_ms % 1000 * 1000 + self._corrected_us(e)
+        return 1000000 - pos % 1000000
+
+    def sync(self, hour, minute, hundredths, day, month, year, t_us):
+        """Anchor UTC hour:minute:hundredths on day/month/2-digit year to ticks_us() value t_us."""
+        ms = ((hour * 60 + minute) * 60) * 1000 + hundredths * 10
+        now_ms = time.ticks_ms()
+        t_ms = time.ticks_add(now_ms, -(time.ticks_diff(time.ticks_us(), t_us) // 1000))
+        self._measure_drift(ms, t_ms)
+        self._anchor_us = t_us
+        self._anchor_ms = ms
+        self._day = days_from_civil(2000 + year, month, day)
+        self._last_sync_ms = now_ms
+        self._synced = True
+
+    def _measure_drift(self, ms, t_ms):
+        """Compare GPS and local elapsed time since the drift reference and fold it into the estimate."""
+        if self._ref_ms >= 0:
+            local = time.ticks_diff(t_ms, self._ref_ticks_ms)
+            if local < _DRIFT_WINDOW_MS:
+                return
+            diff = (ms - self._ref_ms) % _DAY_MS - local
+            if local < _DAY_MS // 2 and abs(diff) * _DRIFT_REJECT <= local:
+                meas = diff * 16000 // (local // 1000)
+                if self._drift_known:
+                    self._ppm16 += (meas - self._ppm16) // 4
+                else:
+                    self._ppm16 = meas
+                    self._drift_known = True
+        self._ref_ticks_ms = t_ms
+        self._ref_ms = ms
+
+    def _corrected_us(self, e_us):
+        """Drift-corrected GPS microseconds for e_us local microseconds."""
+        return e_us + (e_us // 1000) * self._ppm16 // 16000
+
+    def _roll(self, now_us, e_us):
+        """Move the anchor forward to now_us, carrying the date over midnight."""
+        c = self._corrected_us(e_us)
+        self._anchor_us = time.ticks_add(now_us, -(c % 1000))
+        ms = self._anchor_ms + c // 1000
+        while ms >= _DAY_MS:
+            ms -= _DAY_MS
+            self._day += 1
+        self._anchor_ms = ms
+
+    def update(self):
+        """Recompute `now` from the anchor. Returns CHANGED_* bits for the displayed second."""
+        if not self._synced:
+            return 0
+        now_us = time.ticks_us()
+        e = time.ticks_diff(now_us, self._anchor_us)
+        if e < 0:
+            e = 0
+        ms = self._anchor_ms + self._corrected_us(e) // 1000
+        if e >= _ROLL_US or ms >= _DAY_MS:
+            self._roll(now_us, e)
+            ms = self._anchor_ms + self._corrected_us(time.ticks_diff(now_us, self._anchor_us)) // 1000
+        sec = ms // 1000
+        last = self._last_sec
+        if sec == last:
+            return 0
+        # A resync landing just before the second already shown must not step the display back
+        if last >= 0 and (last - sec) % 86400 == 1:
+            return 0
+        self._last_sec = sec
+        n = self.now
+        day = self._day
+        changed = CHANGED_TIME
+        # Local dates roll over on whole minutes (zone offsets are in minutes)
+        if sec // 60 != n[CLK_SOD] // 60 or day != n[CLK_DAYS]:
+            changed |= CHANGED_DATE
+        if day != n[CLK_DAYS]:
+            ymd = self._ymd
+            civil_from_days(day, ymd)
+            n[CLK_DAY] = ymd[2]
+            n[CLK_MONTH] = ymd[1]
+            n[CLK_YEAR] = ymd[0] % 100
+            n[CLK_DAYS] = day
+        n[CLK_HOUR] = sec // 3600
+        n[CLK_MINUTE] = sec // 60 % 60
+        n[CLK_SECOND] = sec % 60
+        n[CLK_SOD] = sec
+        return changed
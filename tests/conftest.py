@@ -0,0 +1,55 @@
+"""Host-side test setup.
+
+The MicroPython-only modules (machine, st7789, framebuf) come from
+tests/fakes, src/ is importable, and time gains the MicroPython ticks
+functions driven by a manual clock, so tests control every timestamp.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(_HERE, 'fakes'))
+sys.path.insert(0, os.path.join(_HERE, '..', 'src'))
+
+_TICKS_MASK = 0x3FFFFFFF
+_TICKS_HALF = 0x20000000
+
+
+class Clock:
+    """Manual microsecond clock behind time.ticks_us() / ticks_ms() / sleep_ms()."""
+
+    def __init__(self):
+        self.us = 0
+
+    def advance_us(self, n):
+        self.us += n
+
+    def advance_ms(self, n):
+        self.us += n * 1000
+
+
+_clock = Clock()
+
+
+def _ticks_diff(a, b):
+    d = (a - b) & _TICKS_MASK
+    return d - (_TICKS_MASK + 1) if d >= _TICKS_HALF else d
+
+
+time.ticks_us = lambda: _clock.us & _TICKS_MASK
+time.ticks_ms = lambda: (_clock.us // 1000) & _TICKS_MASK
+time.ticks_diff = _ticks_diff
+time.ticks_add = lambda a, b: (a + b) & _TICKS_MASK
+time.sleep_ms = _clock.advance_ms
+time.sleep_us = _clock.advance_us
+
+
+@pytest.fixture
+def clock():
+    """The manual clock, restarted at 0."""
+    _clock.us = 0
+    return _clock
@@ -0,0 +1,41 @@
+"""Host stand-in for MicroPython's framebuf: RGB565 only, pixel by pixel."""
+
+RGB565 = 1
+
+
+class FrameBuffer:
+    def __init__(self, buf, w, h, fmt, stride=None):
+        assert fmt == RGB565
+        self.buf = buf
+        self.w = w
+        self.h = h
+        self.stride = stride or w
+        assert len(buf) >= self.stride * h * 2
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self.w and 0 <= y < self.h):
+            return None
+        i = (y * self.stride + x) * 2
+        if c is None:
+            return self.buf[i] | self.buf[i + 1] << 8
+        self.buf[i] = c & 0xFF
+        self.buf[i + 1] = c >> 8 & 0xFF
+
+    def fill_rect(self, x, y, w, h, c):
+        for yy in range(max(y, 0), min(y + h, self.h)):
+            for xx in range(max(x, 0), min(x + w, self.w)):
+                self.pixel(xx, yy, c)
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def fill(self, c):
+        self.fill_rect(0, 0, self.w, self.h, c)
+
+    def blit(self, src, x, y):
+        for yy in range(src.h):
+            for xx in range(src.w):
+                self.pixel(x + xx, y + yy, src.pixel(xx, yy))
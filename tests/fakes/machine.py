@@ -0,0 +1,81 @@
+"""Host stand-in for MicroPython's machine module: Pin and UART without hardware."""
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 2
+    IRQ_RISING = 4
+    IRQ_FALLING = 8
+
+    def __init__(self, *args, **kwargs):
+        self._value = 1
+        self.handler = None
+
+    def value(self, v=None):
+        if v is None:
+            return self._value
+        self._value = v
+
+    def irq(self, handler=None, trigger=None, **kwargs):
+        self.handler = handler
+
+    def pulse(self):
+        """Simulate an edge: run the installed interrupt handler."""
+        self.handler(self)
+
+
+class PWM:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def duty_u16(self, v):
+        pass
+
+
+class UART:
+    """Receives whatever is appended to `rx`; written bytes collect in `tx`."""
+    IRQ_RX = 1
+    IRQ_RXIDLE = 2
+
+    def __init__(self, *args, **kwargs):
+        self.baudrate = kwargs.get('baudrate', 9600)
+        self.rx = bytearray()
+        self.tx = bytearray()
+        self.handler = None
+
+    def init(self, baudrate=None, **kwargs):
+        if baudrate is not None:
+            self.baudrate = baudrate
+
+    def any(self):
+        return len(self.rx)
+
+    def read(self, n=-1):
+        if not self.rx:
+            return None
+        if n is None or n < 0:
+            n = len(self.rx)
+        data = bytes(self.rx[:n])
+        del self.rx[:n]
+        return data
+
+    def readinto(self, buf, n=-1):
+        if n is None or n < 0:
+            n = len(buf)
+        data = self.read(min(n, len(buf)))
+        if not data:
+            return None
+        buf[:len(data)] = data
+        return len(data)
+
+    def write(self, data):
+        self.tx += data
+        return len(data)
+
+    def irq(self, handler=None, trigger=None, **kwargs):
+        self.handler = handler
+
+
+def freq(*args):
+    pass
@@ -0,0 +1,81 @@
+"""Host stand-in for the st7789 driver: a pixel-accurate 320x170 screen that
+counts driver calls and pixels sent."""
+
+WIDTH = 320
+HEIGHT = 170
+
+BLACK = 0x0000
+WHITE = 0xFFFF
+
+
+def color565(r, g, b):
+    return (r & 0xF8) << 8 | (g & 0xFC) << 3 | b >> 3
+
+
+class ST7789:
+    def __init__(self, *args, **kwargs):
+        self.screen = [0] * (WIDTH * HEIGHT)
+        self.calls = []
+        self.pixels = 0
+
+    def reset_counts(self):
+        self.calls = []
+        self.pixels = 0
+
+    def _record(self, name, pixels):
+        self.calls.append(name)
+        self.pixels += pixels
+
+    def _rect(self, x, y, w, h, c):
+        for yy in range(max(y, 0), min(y + h, HEIGHT)):
+            for xx in range(max(x, 0), min(x + w, WIDTH)):
+                self.screen[yy * WIDTH + xx] = c
+
+    def init(self):
+        pass
+
+    def fill(self, c):
+        self._record('fill', WIDTH * HEIGHT)
+        self._rect(0, 0, WIDTH, HEIGHT, c)
+
+    def hline(self, x, y, w, c):
+        self._record('hline', w)
+        self._rect(x, y, w, 1, c)
+
+    def fill_rect(self, x, y, w, h, c):
+        self._record('fill_rect', w * h)
+        self._rect(x, y, w, h, c)
+
+    def write(self, font, text, x, y, fg, bg=0):
+        # The driver takes str or bytes, not bytearray or memoryview
+        if not isinstance(text, (str, bytes)):
+            raise TypeError("write() text must be str or bytes")
+        if isinstance(text, bytes):
+            text = text.decode()
+        x0 = x
+        ow = font.OFFSET_WIDTH
+        for ch in text:
+            i = font.MAP.find(ch)
+            if i < 0:
+                continue
+            w = font.WIDTHS[i]
+            bit = 0
+            for k in range(ow):
+                bit = bit << 8 | font.OFFSETS[i * ow + k]
+            for r in range(font.HEIGHT):
+                for c in range(w):
+                    on = font.BITMAPS[bit >> 3] >> (7 - (bit & 7)) & 1
+                    bit += 1
+                    if 0 <= x + c < WIDTH and 0 <= y + r < HEIGHT:
+                        self.screen[(y + r) * WIDTH + x + c] = fg if on else bg
+            x += w
+        self._record('write', (x - x0) * font.HEIGHT)
+
+    def blit_buffer(self, buf, x, y, w, h):
+        assert len(buf) == w * h * 2, (len(buf), w, h)
+        for r in range(h):
+            for c in range(w):
+                k = (r * w + c) * 2
+                if 0 <= x + c < WIDTH and 0 <= y + r < HEIGHT:
+                    self.screen[(y + r) * WIDTH + x + c] = buf[k] << 8 | buf[k + 1]
+        self._record('blit', w * h)
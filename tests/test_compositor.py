@@ -0,0 +1,16 @@
+"""Compositor flush statistics."""
+
+import st7789
+
+from compositor import Compositor
+
+
+def test_stats_describe_the_last_flush_even_when_nothing_was_dirty():
+    tft = st7789.ST7789()
+    c = Compositor(tft, 320, 170)
+    c.fill_rect(10, 20, 30, 4, 0xFFFF)
+    assert c.flush() == 1
+    assert (c.rects, c.blits, c.pixels, c.bytes, c.frames) == (1, 1, 120, 240, 1)
+    assert tft.screen[20 * 320 + 10] == 0xFFFF
+    assert c.flush() == 0
+    assert (c.rects, c.blits, c.pixels, c.bytes, c.frames) == (0, 0, 0, 0, 1)
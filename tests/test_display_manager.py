@@ -0,0 +1,164 @@
+"""DisplayManager against the pixel-counting fake st7789: partial redraws must
+leave exactly the screen a fresh full draw produces, with few driver calls."""
+
+from array import array
+
+import pytest
+import st7789
+
+import display_manager as dm
+from digit_fmt import hms, ymd
+from gps_reader import DIRTY_ALL
+from time_core import civil_from_days, local_day, local_sod
+
+
+class FakeGPS:
+    """The GPSReader surface DisplayManager reads, driven by plain attributes."""
+
+    def __init__(self):
+        self.dirty = DIRTY_ALL
+        self.time_is_valid = True
+        self.has_ever_had_fix = True
+        self.has_fix = True
+        self.fix_type = 3
+        self.satellites_in_use = 8
+        self.satellites_in_view = 12
+        self.day_number = 9785          # 2026-10-16
+        self.second_of_day = 12 * 3600
+        self.lat = "48.117302 N"
+        self.lon = "11.516667 E"
+        self.maidenhead = "JN58td"
+        self.utm = "32U 691655E 5332401N"
+        self._ymd = array('i', (0, 0, 0))
+
+    def tick(self, seconds=1):
+        self.second_of_day += seconds
+        self.day_number += self.second_of_day // 86400
+        self.second_of_day %= 86400
+        self.dirty = DIRTY_ALL
+
+    @property
+    def instant(self):
+        return self.day_number * 86400 + self.second_of_day
+
+    @property
+    def seconds(self):
+        return self.second_of_day % 60
+
+    def ack(self, mask):
+        self.dirty &= ~mask
+
+    def time_into(self, buf, tz_offset=0):
+        t = local_sod(self.second_of_day, tz_offset)
+        hms(buf, t // 3600, t // 60 % 60, t % 60)
+
+    def date_into(self, buf, tz_offset=0):
+        civil_from_days(local_day(self.day_number, self.second_of_day, tz_offset), self._ymd)
+        ymd(buf, self._ymd[0], self._ymd[1], self._ymd[2])
+
+    def lat_str(self):
+        return self.lat
+
+    def lon_str(self):
+        return self.lon
+
+
+class FakeTZ:
+    offset = 120
+    abbreviation = "CEST"
+    dst_stale = False
+
+    def update_dst(self, t):
+        pass
+
+
+def _manager(tft, cache, composite):
+    m = dm.DisplayManager(tft, glyph_cache_bytes=cache, composite=composite)
+    m.init_screen()
+    return m
+
+
+def _fresh_screen(gps, tz, cache, composite):
+    tft = st7789.ST7789()
+    gps.dirty = DIRTY_ALL
+    _manager(tft, cache, composite).update(gps, tz)
+    return tft.screen
+
+
+@pytest.mark.parametrize("cache, composite", [(0, False), (20480, False), (0, True)])
+def test_partial_redraws_match_a_full_draw(clock, cache, composite):
+    gps = FakeGPS()
+    tz = FakeTZ()
+    tft = st7789.ST7789()
+    m = _manager(tft, cache, composite)
+    steps = (
+        lambda: gps.tick(),
+        lambda: gps.tick(9),                      # seconds tens and units change
+        lambda: gps.tick(3600 * 12 - 600),        # date rolls over locally first
+        lambda: setattr(gps, 'satellites_in_use', 12),
+        lambda: setattr(gps, 'has_fix', False),   # placeholders in other colours
+        lambda: setattr(gps, 'has_fix', True),
+        lambda: setattr(gps, 'lat', "8.1 N"),     # shorter text
+        lambda: setattr(gps, 'time_is_valid', False),
+        lambda: setattr(gps, 'time_is_valid', True),
+    )
+    for step in steps:
+        step()
+        gps.tick()
+        clock.advance_ms(6000)                    # past every field's refresh period
+        m.update(gps, tz)
+        expected = _fresh_screen(gps, tz, cache, composite)
+        assert tft.screen == expected
+
+
+def test_next_second_redraws_one_digit_per_time_line(clock):
+    gps = FakeGPS()
+    tz = FakeTZ()
+    tft = st7789.ST7789()
+    m = _manager(tft, 0, False)
+    m.update(gps, tz)
+    tft.reset_counts()
+    gps.tick()
+    m.update(gps, tz)
+    digit = dm.font_big.WIDTHS[dm.font_big.MAP.index('1')] * dm.font_big.HEIGHT
+    assert tft.calls == ['write', 'write']
+    assert tft.pixels == 2 * digit
+
+
+def test_shorter_text_is_overwritten_without_a_clear(clock):
+    gps = FakeGPS()
+    tz = FakeTZ()
+    tft = st7789.ST7789()
+    m = _manager(tft, 0, False)
+    m.update(gps, tz)
+    clock.advance_ms(6000)
+    gps.lat = "8.1 N"
+    gps.dirty = DIRTY_ALL
+    tft.reset_counts()
+    m.update(gps, tz)
+    assert 'fill_rect' not in tft.calls
+
+
+def test_compositing_merges_driver_calls_into_blits(clock):
+    gps = FakeGPS()
+    tz = FakeTZ()
+    direct = st7789.ST7789()
+    composed = st7789.ST7789()
+    d = _manager(direct, 0, False)
+    c = _manager(composed, 0, True)
+    direct.reset_counts()
+    composed.reset_counts()
+    d.update(gps, tz)
+    gps.dirty = DIRTY_ALL
+    c.update(gps, tz)
+    assert composed.screen == direct.screen
+    assert set(composed.calls) == {'blit'}
+    assert len(direct.calls) == 13 and len(composed.calls) == 6
+    direct.reset_counts()
+    composed.reset_counts()
+    gps.tick()
+    d.update(gps, tz)
+    gps.dirty = DIRTY_ALL
+    c.update(gps, tz)
+    assert composed.screen == direct.screen
+    assert direct.calls == ['write', 'write'] and composed.calls == ['blit']
@@ -0,0 +1,45 @@
+"""MicropyGPS.feed_bytes() against the byte-at-a-time update() parser."""
+
+import pytest
+
+from micropyGPS import MicropyGPS
+
+
+def sentence(body):
+    x = 0
+    for c in body.encode():
+        x ^= c
+    return "${}*{:02X}\r\n".format(body, x).encode()
+
+
+_STREAM = (sentence("GPRMC,123456.00,A,4807.038,N,01131.000,E,0.0,0.0,161026,,,A")
+           + sentence("GPGGA,123456.00,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,")
+           + sentence("GPGSA,A,3,04,05,,09,12,,,24,,,,,2.5,1.3,2.1")
+           + sentence("GPRMC,123457.00,A,4807.038,N,01131.000,E,0.0,0.0,161026,,,A"))
+
+
+def _noisy(data):
+    """Insert bytes update() ignores (NUL, 0xFF, a UBX sync byte) throughout the stream."""
+    out = bytearray()
+    for k, c in enumerate(data):
+        out.append(c)
+        if k % 7 == 3:
+            out.append((0x00, 0xFF, 0xB5)[k % 3])
+    return bytes(out)
+
+
+@pytest.mark.parametrize("step", [1, 5, 64, 4096])
+def test_feed_bytes_ignores_the_bytes_update_ignores(step):
+    data = _noisy(_STREAM)
+    ref = MicropyGPS()
+    for c in data:
+        ref.update(c)
+    ref.end_epoch()
+    bulk = MicropyGPS()
+    for k in range(0, len(data), step):
+        bulk.feed_bytes(data[k:k + step])
+    bulk.end_epoch()
+    assert ref.clean_sentences == 4 and ref.crc_fails == 0
+    assert (bulk.clean_sentences, bulk.crc_fails, bulk.parsed_sentences) == (
+        ref.clean_sentences, ref.crc_fails, ref.parsed_sentences)
+    assert list(bulk.snapshot) == list(ref.snapshot)
@@ -0,0 +1,69 @@
+"""PPS edge matching and lock state, with a fake Pin pulsed on the manual clock."""
+
+from pps import PPS
+
+
+def _pulse(pps):
+    pps._pin.pulse()
+
+
+def test_no_pulse_no_match(clock):
+    pps = PPS(4)
+    clock.advance_ms(100)
+    assert pps.match(clock.us) == -1
+    assert not pps.locked
+
+
+def test_burst_is_matched_to_the_pulse_before_it(clock):
+    pps = PPS(4)
+    clock.advance_ms(1000)
+    _pulse(pps)
+    edge = clock.us
+    clock.advance_ms(120)
+    assert pps.match(clock.us) == edge
+    assert pps.locked
+    assert pps.latency.count == 1 and pps.latency.mean_us == 120000
+    # The same pulse is not matched twice
+    assert pps.match(clock.us) == -1
+
+
+def test_back_dated_burst_slightly_before_its_pulse_matches(clock):
+    pps = PPS(4)
+    clock.advance_ms(1000)
+    _pulse(pps)
+    assert pps.match(clock.us - 15000) == clock.us
+    assert pps.latency.min_us == -15000
+
+
+def test_previous_pulse_is_used_when_a_newer_one_already_fired(clock):
+    pps = PPS(4)
+    clock.advance_ms(1000)
+    _pulse(pps)
+    edge = clock.us
+    clock.advance_ms(300)
+    burst = clock.us
+    clock.advance_ms(700)
+    _pulse(pps)                 # next second's pulse before the burst was processed
+    assert pps.match(burst) == edge
+
+
+def test_pulse_too_long_before_the_burst_is_not_matched(clock):
+    pps = PPS(4)
+    clock.advance_ms(1000)
+    _pulse(pps)
+    clock.advance_ms(950)
+    assert pps.match(clock.us) == -1
+
+
+def test_lock_is_lost_after_2_5_s_without_a_match(clock):
+    pps = PPS(4)
+    for _ in range(3):
+        clock.advance_ms(880)
+        _pulse(pps)
+        clock.advance_ms(120)
+        assert pps.match(clock.us) >= 0
+    assert pps.locked and pps.pulses == 3
+    clock.advance_ms(2499)
+    assert pps.locked
+    clock.advance_ms(1)
+    assert not pps.locked
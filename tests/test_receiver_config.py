@@ -0,0 +1,111 @@
+"""configure() against a fake u-blox receiver that ACKs every UBX command it hears."""
+
+import struct
+
+import machine
+import pytest
+
+import gps_reader
+from gps_reader import GPSReader
+from receiver_config import configure, ubx_frame
+
+_CFG = 0x06
+_CFG_PRT = 0x00
+_CFG_MSG = 0x01
+_CFG_RATE = 0x08
+_NAV = 0x01
+_NMEA = 0xF0
+_PARSED = (0x00, 0x02, 0x03, 0x04)      # GGA, GSA, GSV, RMC
+
+
+class Receiver(machine.UART):
+    """UART whose far end answers each frame with NMEA noise and ACK-ACK (or ACK-NAK for
+    the cls/id pairs in `nak`), only when both sides run at the same baud rate. CFG-PRT
+    switches the receiver's rate without an ACK, as the real one garbles it."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.receiver_baud = 9600
+        self.nak = set()
+        self.heard = []          # (cls, id, payload) of every command received
+        self.handlers = []       # RX handler installed at each write
+
+    def write(self, data):
+        n = super().write(data)
+        self.handlers.append(self.handler)
+        if self.baudrate != self.receiver_baud:
+            return n
+        data = bytes(data)
+        cls, id_ = data[2], data[3]
+        payload = data[6:6 + (data[4] | data[5] << 8)]
+        self.heard.append((cls, id_, payload))
+        if (cls, id_) == (_CFG, _CFG_PRT):
+            self.receiver_baud = struct.unpack_from('<I', payload, 8)[0]
+            return n
+        ack = 0 if (cls, id_) in self.nak else 1
+        self.rx += b'$GPTXT,01,01,02,noise*00\r\n' + ubx_frame(0x05, ack, bytes((cls, id_)))
+        if self.handler is not None:
+            # IRQ mode: the interrupt handler takes whatever arrives
+            self.handler(self)
+        return n
+
+    def rates(self, cls):
+        """CFG-MSG rate last set for each message id of class cls."""
+        return {p[1]: p[2] for c, i, p in self.heard if (c, i) == (_CFG, _CFG_MSG) and p[0] == cls}
+
+
+@pytest.fixture
+def gps(clock, monkeypatch):
+    monkeypatch.setattr(gps_reader, 'UART', Receiver)
+    return GPSReader()
+
+
+def test_configure_selects_sentences_baud_and_rate(gps):
+    assert configure(gps, baudrate=115200, rate_hz=5)
+    uart = gps.uart
+    assert uart.baudrate == uart.receiver_baud == 115200
+    nmea = uart.rates(_NMEA)
+    assert len(nmea) == 13
+    assert all(rate == (1 if msg in _PARSED else 0) for msg, rate in nmea.items())
+    assert uart.rates(_NAV) == {0x07: 0, 0x35: 0}
+    rate = [p for c, i, p in uart.heard if (c, i) == (_CFG, _CFG_RATE) and p]
+    assert struct.unpack('<HHH', rate[-1]) == (200, 1, 1)
+
+
+def test_ubx_mode_turns_nmea_off_and_nav_on(gps):
+    assert configure(gps, ubx=True)
+    assert set(gps.uart.rates(_NMEA).values()) == {0}
+    assert gps.uart.rates(_NAV) == {0x07: 1, 0x35: 1}
+
+
+def test_receiver_left_at_the_new_rate_is_found_by_probing(gps):
+    gps.uart.receiver_baud = 115200
+    assert configure(gps, baudrate=115200)
+    assert gps.uart.baudrate == 115200
+    assert not any((c, i) == (_CFG, _CFG_PRT) for c, i, p in gps.uart.heard)
+
+
+def test_nak_fails_the_result_but_not_the_setup(gps):
+    gps.uart.nak.add((_CFG, _CFG_MSG))
+    assert not configure(gps, baudrate=115200)
+    assert gps.uart.baudrate == gps.uart.receiver_baud == 115200
+
+
+def test_silent_receiver_leaves_the_uart_at_9600(gps):
+    gps.uart.receiver_baud = 4800
+    assert not configure(gps)
+    assert gps.uart.baudrate == 9600
+    assert not gps.uart.heard
+
+
+def test_irq_mode_reads_acks_with_the_handler_removed(clock, monkeypatch):
+    monkeypatch.setattr(gps_reader, 'UART', Receiver)
+    gps = GPSReader(irq_rx=True)
+    uart = gps.uart
+    assert configure(gps, baudrate=115200)
+    assert uart.handlers and all(h is None for h in uart.handlers)
+    # Receiving resumes into the ring afterwards
+    assert uart.handler is not None
+    uart.rx += b'$GPTXT*00\r\n'
+    uart.handler(uart)
+    assert not uart.rx
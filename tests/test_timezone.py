@@ -0,0 +1,37 @@
+"""TimezoneManager button cycle and zones chosen by name."""
+
+from timezone import TimezoneManager
+
+
+def _press(tz, clock):
+    tz._button.value(0)
+    tz.check_button()
+    clock.advance_ms(100)
+    tz._button.value(1)
+    action = tz.check_button()
+    clock.advance_ms(300)
+    return action
+
+
+def test_button_cycles_the_seven_us_zones(clock):
+    tz = TimezoneManager()
+    clock.advance_ms(1000)
+    names = []
+    for _ in range(7):
+        assert _press(tz, clock) == 1
+        names.append(tz.name)
+    assert names == ["US Central", "US Mountain", "Arizona", "US Pacific", "Alaska", "Hawaii",
+                     "US Eastern"]
+
+
+def test_zone_outside_the_cycle_is_chosen_by_name(clock):
+    tz = TimezoneManager()
+    assert tz.set_zone("Nepal")
+    tz.update_dst(0)
+    assert tz.offset == 345 and tz.label == "Nepal (UTC+5:45)"
+    # A manual choice is kept from auto-detection
+    assert not tz.set_from_location(40.7, -74.0)
+    assert not tz.set_zone("Atlantis")
+    clock.advance_ms(1000)
+    _press(tz, clock)
+    assert tz.name == "US Eastern"
@@ -0,0 +1,104 @@
+"""UBXParser fed captured-layout NAV-PVT / NAV-SAT frames built with the real checksum."""
+
+import struct
+
+import pytest
+
+from micropyGPS import (SNAP_DAY, SNAP_FIX_TYPE, SNAP_HOUR, SNAP_HUNDREDTHS, SNAP_LAT_DEG,
+                        SNAP_LAT_HEMI, SNAP_LAT_MIN, SNAP_LON_DEG, SNAP_LON_HEMI, SNAP_LON_MIN,
+                        SNAP_MINUTE, SNAP_MONTH, SNAP_SIU, SNAP_SIV, SNAP_TIME_VALID, SNAP_VALID,
+                        SNAP_YEAR)
+from ubx import CLS_NAV, ID_NAV_PVT, ID_NAV_SAT, UBXParser, fletcher
+
+
+def frame(cls, id_, payload):
+    body = bytes((cls, id_)) + struct.pack('<H', len(payload)) + payload
+    ck = fletcher(body, 0, len(body))
+    return b'\xb5\x62' + body + bytes((ck >> 8, ck & 0xFF))
+
+
+def nav_sat(itow, num_svs):
+    return frame(CLS_NAV, ID_NAV_SAT, struct.pack('<IBBH', itow, 1, num_svs, 0) + bytes(12 * num_svs))
+
+
+def nav_pvt(itow, hms=(12, 34, 56), nano=0, valid=0x07, fix=3, flags=0x01, num_sv=9,
+            lon=115166670, lat=481173020):
+    payload = bytearray(92)
+    struct.pack_into('<IHBBBBBBIiBBBBii', payload, 0, itow, 2026, 10, 16, hms[0], hms[1], hms[2],
+                     valid, 50, nano, fix, flags, 0, num_sv, lon, lat)
+    return frame(CLS_NAV, ID_NAV_PVT, bytes(payload))
+
+
+def feed(parser, data, step):
+    for k in range(0, len(data), step):
+        parser.feed_bytes(data[k:k + step])
+
+
+@pytest.mark.parametrize("num_svs", [5, 64, 65, 255])
+@pytest.mark.parametrize("step", [1, 7, 4096])
+def test_nav_sat_with_any_number_of_satellites_is_accepted(num_svs, step):
+    p = UBXParser()
+    feed(p, b'$GPTXT,noise*00\r\n' + nav_sat(1000, num_svs) + nav_sat(2000, 3), step)
+    assert p.crc_fails == 0 and p.skipped_messages == 0
+    assert p.parsed_messages == 2
+    # The second frame's new iTOW published the first epoch
+    assert p.epoch == 1
+    assert p.snapshot[SNAP_SIV] == num_svs
+
+
+def test_nav_pvt_is_decoded_into_the_snapshot_layout():
+    p = UBXParser()
+    p.feed_bytes(nav_pvt(1000, nano=-4000000) + nav_pvt(2000))
+    snap = p.snapshot
+    assert (snap[SNAP_HOUR], snap[SNAP_MINUTE], snap[SNAP_HUNDREDTHS]) == (12, 34, 5600)
+    assert (snap[SNAP_DAY], snap[SNAP_MONTH], snap[SNAP_YEAR]) == (16, 10, 26)
+    assert snap[SNAP_TIME_VALID] == 1 and snap[SNAP_VALID] == 1 and snap[SNAP_FIX_TYPE] == 3
+    # 48.1173020 N = 48 deg 7.0381 min, 11.5166670 E = 11 deg 31.0000 min
+    assert (snap[SNAP_LAT_DEG], snap[SNAP_LAT_MIN], snap[SNAP_LAT_HEMI]) == (48, 70381, ord('N'))
+    assert (snap[SNAP_LON_DEG], snap[SNAP_LON_MIN], snap[SNAP_LON_HEMI]) == (11, 310000, ord('E'))
+    # In view falls back to in use until a NAV-SAT arrives
+    assert snap[SNAP_SIU] == snap[SNAP_SIV] == 9
+
+
+def test_southern_western_position_and_rounded_seconds():
+    p = UBXParser()
+    p.feed_bytes(nav_pvt(1000, hms=(0, 0, 59), nano=6000000, lon=-1, lat=-335000000))
+    p.end_epoch()
+    snap = p.snapshot
+    assert snap[SNAP_HUNDREDTHS] == 5901
+    assert (snap[SNAP_LAT_DEG], snap[SNAP_LAT_MIN], snap[SNAP_LAT_HEMI]) == (33, 300000, ord('S'))
+    assert (snap[SNAP_LON_DEG], snap[SNAP_LON_MIN], snap[SNAP_LON_HEMI]) == (0, 0, ord('W'))
+
+
+@pytest.mark.parametrize("fix, flags", [(0, 0), (5, 1), (3, 0)])
+def test_no_fix_keeps_time_but_not_position(fix, flags):
+    p = UBXParser()
+    p.feed_bytes(nav_pvt(1000, fix=fix, flags=flags))
+    p.end_epoch()
+    snap = p.snapshot
+    assert snap[SNAP_VALID] == 0 and snap[SNAP_TIME_VALID] == 1
+    assert snap[SNAP_LAT_DEG] == snap[SNAP_LAT_MIN] == 0
+
+
+def test_epoch_groups_messages_by_itow_and_carries_its_mark():
+    p = UBXParser()
+    p.mark = 111
+    p.feed_bytes(nav_pvt(1000) + nav_sat(1000, 14))
+    assert p.epoch == 0
+    p.mark = 222
+    p.feed_bytes(nav_pvt(2000, num_sv=10))
+    assert p.epoch == 1 and p.epoch_mark == 111
+    assert p.snapshot[SNAP_SIU] == 9 and p.snapshot[SNAP_SIV] == 14
+    assert p.end_epoch() and p.epoch_mark == 222
+    assert not p.end_epoch()
+
+
+@pytest.mark.parametrize("step", [1, 3, 4096])
+def test_corrupt_frame_is_dropped_and_the_stream_recovers(step):
+    bad = bytearray(nav_pvt(1000))
+    bad[20] ^= 0x01
+    p = UBXParser()
+    feed(p, b'\xb5\xb5' + bytes(bad) + b'\xb5\x00' + nav_pvt(2000, hms=(1, 2, 3)), step)
+    p.end_epoch()
+    assert p.crc_fails == 1 and p.parsed_messages == 1
+    assert p.snapshot[SNAP_HOUR] == 1